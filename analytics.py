@@ -0,0 +1,61 @@
+import plotly.express as px
+import streamlit as st
+
+from cohort_cube import DIMENSIONS, MIN_COHORT, OTHER, refresh
+
+# Cohort cube (scored once; refreshed incrementally at most every 5 minutes)
+@st.cache_resource(ttl=300, show_spinner="Refreshing cohort cube...")
+def get_cube():
+    cube, _ = refresh()
+    return cube
+
+cube = get_cube()
+
+# App design
+st.set_page_config(page_title="Cohort Risk Analytics", page_icon="📊", layout="wide")
+st.markdown("<h1 style='color:#00796B; text-align:center;'>📊 Student Cohort Risk Analytics</h1>", unsafe_allow_html=True)
+st.write("Observed depression rates and the model's mean predicted risk, by cohort. Every view reads the pre-aggregated cube – no individual rows leave the server.")
+st.caption(f"To protect privacy, cohorts with fewer than {MIN_COHORT} students are merged into “{OTHER}”.")
+
+# Sidebar: filters and breakdown
+st.sidebar.header("🔍 Filter cohorts")
+filters = {d: st.sidebar.multiselect(d, cube.values(d)) for d in DIMENSIONS}
+st.sidebar.header("📐 Break down by")
+by = st.sidebar.selectbox("Rows", DIMENSIONS, index=DIMENSIONS.index("Sleep Duration"))
+then = st.sidebar.selectbox("Split by (optional)", ["—"] + [d for d in DIMENSIONS if d != by])
+
+# Headline numbers
+total = cube.query(**filters)
+if not len(total):
+    st.warning(f"Fewer than {MIN_COHORT} students match these filters – widen them to see figures.")
+    st.stop()
+c1, c2, c3 = st.columns(3)
+c1.metric("Students", f"{int(total['students'].iloc[0]):,}")
+c2.metric("Observed depression rate", f"{total['observed_rate'].iloc[0]:.1%}")
+c3.metric("Mean predicted risk", f"{total['mean_risk'].iloc[0]:.1%}")
+
+# Breakdown
+st.subheader(f"By {by}" + (f" and {then}" if then != "—" else ""))
+if then == "—":
+    table = cube.query([by], **filters)
+    st.bar_chart(table.set_index(by)[["observed_rate", "mean_risk"]], stack=False)
+else:
+    table = cube.query([by, then], **filters)
+    st.bar_chart(table.pivot(index=by, columns=then, values="observed_rate"), stack=False)
+st.dataframe(
+    table.rename(columns={"students": "Students", "depressed": "Depressed", "observed_rate": "Observed rate",
+                          "mean_risk": "Mean predicted risk"})
+         .drop(columns=["suicidal", "suicidal_depressed"]),
+    hide_index=True, width="stretch",
+)
+
+# Sunburst: City -> Depression -> Suicidal Thoughts (as in Health.ipynb)
+st.subheader("City → Depression → Suicidal Thoughts")
+parts = cube.sunburst("City", **filters)
+parts[["Depression", "Suicidal Thoughts"]] = parts[["Depression", "Suicidal Thoughts"]].replace({1: "Yes", 0: "No"})
+st.plotly_chart(px.sunburst(parts, path=["City", "Depression", "Suicidal Thoughts"], values="students"),
+                width="stretch")
+
+# Footer
+st.markdown("<hr>", unsafe_allow_html=True)
+st.markdown("🔒 **Note:** Aggregates of survey responses for planning support services – not individual diagnoses.")
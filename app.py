@@ -1,9 +1,19 @@
 import streamlit as st
-import joblib
-import pandas as pd
 
-# Load model
-model = joblib.load("Depression_predictor.pkl")
+from instrumentation import METRICS
+from model_registry import ensure_registry
+from prediction_cache import PredictionCache
+from routing import ModelRouter
+
+# Load model (one LRU-cached predictor shared by all sessions, behind the model router)
+@st.cache_resource(show_spinner=False)
+def get_predictor():
+    # A/B candidate and shadow models come from DEPRESSION_AB_* / DEPRESSION_SHADOW_MODELS (see routing.py)
+    # the registry's CURRENT version; a promotion is picked up on the next prediction, no restart
+    return ModelRouter.from_env(PredictionCache(ensure_registry(), maxsize=4096))
+
+predictor = get_predictor()
+schema = predictor.schema  # allowed categories come from the fitted model
 
 # App design
 st.set_page_config(page_title="Student Depression Risk", page_icon="🧠", layout="wide")
@@ -29,43 +39,37 @@ st.write("Mental health matters. This tool helps raise awareness about potential
 
 # Sidebar inputs
 st.sidebar.header("📌 Input Student Details")
-gender = st.sidebar.selectbox("Gender", ["Male", "Female"])
+gender = st.sidebar.selectbox("Gender", schema.categories["Gender"], index=schema.index["Gender"]["Male"])
 age = st.sidebar.slider("Age", 15, 40, 20)
 academic_pressure = st.sidebar.slider("Academic Pressure (1-5)", 1, 5, 3)
 cgpa = st.sidebar.number_input("CGPA", min_value=0.0, max_value=10.0, step=0.1)
 study_satisfaction = st.sidebar.slider("Study Satisfaction (1-5)", 1, 5, 3)
-sleep_duration = st.sidebar.selectbox("Sleep Duration", 
-                                      ['5-6 hours', 'Less than 5 hours', 
-                                       '7-8 hours', 'More than 8 hours', 'Others'])
-diet = st.sidebar.selectbox("Dietary Habits", ['Healthy', 'Moderate', 'Unhealthy', 'Others'])
-degree = st.sidebar.selectbox("Degree", 
-                              ['B.Pharm','BSc','BA','BCA','M.Tech','PhD','Class 12','B.Ed','LLB',
-                               'BE','M.Ed','MSc','BHM','M.Pharm','MCA','MA','B.Com','MD','MBA',
-                               'MBBS','M.Com','B.Arch','LLM','B.Tech','BBA','ME','MHM','Others'])
+sleep_duration = st.sidebar.selectbox("Sleep Duration", schema.categories["Sleep Duration"])
+diet = st.sidebar.selectbox("Dietary Habits", schema.categories["Dietary Habits"])
+degree = st.sidebar.selectbox("Degree", schema.categories["Degree"])
 financial_stress = st.sidebar.slider("Financial Stress (1-5)", 1, 5, 3)
 suicidal = st.sidebar.selectbox("Suicidal Thoughts", ["No", "Yes"])
 fam_hist = st.sidebar.selectbox("Family History of Mental Illness", ["No", "Yes"])
 
-# Convert categorical to numeric (dummy encoding placeholder)
-input_data = pd.DataFrame({
-    'Gender': [gender],
-    'Age': [age],
-    'Academic Pressure': [academic_pressure],
-    'CGPA': [cgpa],
-    'Study Satisfaction': [study_satisfaction],
-    'Sleep Duration': [sleep_duration],
-    'Dietary Habits': [diet],
-    'Degree': [degree],
-    'Financial Stress': [financial_stress],
-    'Suicidal thoughts': [1 if "Yes" in suicidal else 0],
-    'Fam_hist_ml': [1 if "Yes" in fam_hist else 0]
-})
+# Keys must match feature_schema.FEATURES (the predictor rejects anything else)
+input_data = {
+    'Gender': gender,
+    'Age': age,
+    'Academic Pressure': academic_pressure,
+    'CGPA': cgpa,
+    'Study Satisfaction': study_satisfaction,
+    'Sleep Duration': sleep_duration,
+    'Dietary Habits': diet,
+    'Degree': degree,
+    'Financial Stress': financial_stress,
+    'Suicidal Thoughts': 1 if "Yes" in suicidal else 0,
+    'Fam_hist_ml': 1 if "Yes" in fam_hist else 0
+}
 
 # Prediction button
 if st.sidebar.button("🔎 Predict"):
-    # Encoding must match training
     try:
-        prediction = model.predict(input_data)[0]
+        prediction, _ = predictor.predict(input_data)
         if prediction == 1:
             st.error("⚠️ High Risk: The student may be experiencing depression.")
             st.markdown("**💡 Suggestion:** Consider seeking counseling support, stress management, and community help.")
@@ -73,6 +77,7 @@ if st.sidebar.button("🔎 Predict"):
             st.success("✅ Low Risk: The student is unlikely to be experiencing depression.")
             st.markdown("**💚 Keep it up:** Maintain balance with sleep, studies, and healthy habits.")
     except Exception as e:
+        METRICS.inc("prediction_errors_total", app="app", error=type(e).__name__)
         st.warning("⚠️ Something went wrong. Ensure model encoding matches inputs.")
         st.text(str(e))
 
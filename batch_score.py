@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Batch scoring for survey exports shaped like student_depression_dataset.csv
+(streams the CSV in chunks, cleans each chunk with cleaning.clean, scores on a process pool)
+
+Usage:
+    python batch_score.py student_depression_dataset.csv scores.csv
+    python batch_score.py survey.csv scores.parquet --chunksize 100000 --workers 8 --compiled
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from cleaning import clean, read_raw
+from fast_scorer import COMPILED_PATH, MODEL_PATH
+from feature_schema import FEATURES
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+_model = None
+
+
+def _init_worker(model_path, compiled):
+    global _model
+    if compiled:
+        from fast_scorer import FastScorer
+        _model = FastScorer.load(model_path)
+    else:
+        import joblib
+        _model = joblib.load(model_path)
+
+
+def score_chunk(df):
+    df = clean(df, filters=False)
+    proba = _model.predict_proba(df[FEATURES])[:, 1]
+    return pd.DataFrame({"id": df["id"].to_numpy(), "probability": proba, "prediction": (proba >= 0.5).astype(int)})
+
+
+# -----------------------------
+# Output
+# -----------------------------
+class _Writer:
+    """Appends scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._pq = None
+        self._first = True
+
+    def write(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._pq is None:
+                self._pq = pq.ParquetWriter(self.path, table.schema)
+            self._pq.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._pq is not None:
+            self._pq.close()
+
+
+def run(src, dst, model_path=MODEL_PATH, chunksize=50000, workers=None, compiled=False):
+    """Score ``src`` into ``dst``; returns (rows, seconds)."""
+    workers = workers or os.cpu_count() or 1
+    reader = read_raw(src, chunksize=chunksize)
+    writer = _Writer(dst)
+    rows, start = 0, time.perf_counter()
+
+    # at most 2 chunks per worker in flight, results written in input order
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_path, compiled)) as pool:
+        pending = deque()
+        for chunk in reader:
+            pending.append(pool.submit(score_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                out = pending.popleft().result()
+                writer.write(out)
+                rows += len(out)
+        while pending:
+            out = pending.popleft().result()
+            writer.write(out)
+            rows += len(out)
+    writer.close()
+    return rows, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("src", help="survey CSV")
+    parser.add_argument("dst", help="output .csv or .parquet")
+    parser.add_argument("--model", default=None, help="model file (default: .pkl, or .npz with --compiled)")
+    parser.add_argument("--chunksize", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--compiled", action="store_true", help="score with fast_scorer instead of sklearn")
+    args = parser.parse_args()
+
+    model_path = args.model or (COMPILED_PATH if args.compiled else MODEL_PATH)
+    rows, secs = run(args.src, args.dst, model_path, args.chunksize, args.workers, args.compiled)
+    print(f"Scored {rows} rows in {secs:.2f}s ({rows / max(secs, 1e-9):,.0f} rows/sec) -> {args.dst}", file=sys.stderr)
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the prediction path and retraining
+(single-row latency, batch throughput, cold start, peak RSS, retraining time -> JSON)
+
+Usage:
+    python bench.py --out bench.json                      # run everything
+    python bench.py --out bench.json --skip-train         # inference only
+    python bench.py --compare baseline.json bench.json    # flag regressions (exit 1 if any)
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from cleaning import load_clean
+from fast_scorer import COMPILED_PATH, MODEL_PATH
+from feature_schema import FEATURES
+
+BATCH_SIZES = [1, 64, 1000, 100000]
+
+# metric name suffix -> whether bigger is better
+HIGHER_IS_BETTER = ("rows_per_sec",)
+
+
+def _percentiles(samples):
+    a = np.asarray(samples) * 1e6
+    return {"p50_us": float(np.percentile(a, 50)), "p99_us": float(np.percentile(a, 99)), "mean_us": float(a.mean())}
+
+
+def _rows(n, seed=0):
+    data = load_clean()[FEATURES]
+    idx = np.random.default_rng(seed).integers(0, len(data), n)
+    return data.iloc[idx].reset_index(drop=True)
+
+
+# -----------------------------
+# Individual benchmarks
+# -----------------------------
+def bench_single_row(model, n=500, as_frame=True):
+    """The app's path: build a one-row DataFrame from widget values, then model.predict.
+
+    ``as_frame=False`` passes the widget dict straight through (for fast_scorer).
+    """
+    rows = _rows(n).to_dict("records")
+    wrap = (lambda row: pd.DataFrame({k: [v] for k, v in row.items()})) if as_frame else (lambda row: row)
+    model.predict(wrap(rows[0]))  # warm-up
+    samples = []
+    for row in rows:
+        t = time.perf_counter()
+        model.predict(wrap(row))
+        samples.append(time.perf_counter() - t)
+    return _percentiles(samples)
+
+
+def bench_batches(model, sizes=BATCH_SIZES, min_seconds=0.5):
+    out = {}
+    for size in sizes:
+        X = _rows(size, seed=size)
+        model.predict_proba(X)
+        runs, start = 0, time.perf_counter()
+        while True:
+            model.predict_proba(X)
+            runs += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_seconds:
+                break
+        out[str(size)] = {"seconds_per_batch": elapsed / runs, "rows_per_sec": size * runs / elapsed}
+    return out
+
+
+COLD_START = """
+import time
+t = time.perf_counter()
+{load}
+elapsed = time.perf_counter() - t
+hwm = [l.split()[1] for l in open("/proc/self/status") if l.startswith("VmHWM")]
+print(elapsed, hwm[0] if hwm else __import__("resource").getrusage(0).ru_maxrss)
+"""
+
+
+def bench_cold_start(load, repeats=3):
+    """Fresh interpreter: imports + model load, and its peak RSS (VmHWM; ru_maxrss survives exec)."""
+    times, rss = [], []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", COLD_START.format(load=load)],
+                             capture_output=True, text=True, check=True)
+        t, r = out.stdout.split()
+        times.append(float(t))
+        rss.append(int(r))
+    return {"seconds": float(np.median(times)), "peak_rss_mb": float(np.median(rss)) / 1024}
+
+
+def bench_training():
+    import train
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t = time.perf_counter()
+        train.train(out_path=os.path.join(tmp, "m.pkl"), metrics_path=os.path.join(tmp, "m.json"), compare=False,
+                    registry=None)
+        return {"seconds": time.perf_counter() - t}
+
+
+def run(skip_train=False):
+    import joblib
+
+    from fast_scorer import FastScorer
+
+    pipeline = joblib.load(MODEL_PATH)
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "single_row": {"pipeline": bench_single_row(pipeline)},
+        "batch": {"pipeline": bench_batches(pipeline)},
+        "cold_start": {
+            "pipeline": bench_cold_start(f"import joblib; joblib.load({MODEL_PATH!r})"),
+        },
+    }
+    if os.path.exists(COMPILED_PATH):
+        scorer = FastScorer.load(COMPILED_PATH)
+        results["single_row"]["compiled"] = bench_single_row(scorer, as_frame=False)
+        results["batch"]["compiled"] = bench_batches(scorer)
+        results["cold_start"]["compiled"] = bench_cold_start(
+            f"from fast_scorer import FastScorer; FastScorer.load({COMPILED_PATH!r})"
+        )
+    if not skip_train:
+        results["training"] = bench_training()
+    results["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return results
+
+
+# -----------------------------
+# Compare
+# -----------------------------
+def _flatten(d, prefix=""):
+    for k, v in d.items():
+        if k == "meta":
+            continue
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            yield from _flatten(v, key + ".")
+        else:
+            yield key, v
+
+
+def compare(baseline, current, tolerance=0.10):
+    """Return (metric, baseline, current, change, regressed) rows; regressed = worse by more than tolerance."""
+    base, cur = dict(_flatten(baseline)), dict(_flatten(current))
+    rows = []
+    for key in sorted(base.keys() & cur.keys()):
+        b, c = base[key], cur[key]
+        if not b:
+            continue
+        change = (c - b) / b
+        worse = -change if key.endswith(HIGHER_IS_BETTER) else change
+        rows.append((key, b, c, change, worse > tolerance))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="bench.json")
+    parser.add_argument("--skip-train", action="store_true")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"))
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown (default 10%%)")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        rows = compare(baseline, current, args.tolerance)
+        for key, b, c, change, regressed in rows:
+            print(f"{'REGRESSION' if regressed else 'ok':<10} {key:<45} {b:>14.4g} -> {c:<14.4g} ({change:+.1%})")
+        raise SystemExit(1 if any(r[-1] for r in rows) else 0)
+
+    results = run(args.skip_train)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Single-pass, typed cleaning of the student depression survey
+(the ~20 cleaning cells of Health.ipynb as one vectorized pass, plus a columnar cache)
+
+Usage:
+    from cleaning import load_clean
+    data = load_clean("student_depression_dataset.csv")   # cached until the CSV changes
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = "student_depression_dataset.csv"
+CACHE_DIR = ".cache"
+CLEANING_VERSION = 1  # bump when the cleaning rules change, invalidates cached frames
+
+SUICIDAL_Q = "Have you ever had suicidal thoughts ?"
+FAMILY_Q = "Family History of Mental Illness"
+
+RAW_DTYPES = {
+    "id": "int64",
+    "Gender": "category",
+    "Age": "float64",
+    "City": "category",
+    "Profession": "category",
+    "Academic Pressure": "float64",
+    "Work Pressure": "float64",
+    "CGPA": "float64",
+    "Study Satisfaction": "float64",
+    "Job Satisfaction": "float64",
+    "Sleep Duration": "category",
+    "Dietary Habits": "category",
+    "Degree": "category",
+    SUICIDAL_Q: "category",
+    "Work/Study Hours": "float64",
+    "Financial Stress": "category",  # contains '?'
+    FAMILY_Q: "category",
+    "Depression": "int8",
+}
+
+QUOTED = ["Profession", "Sleep Duration", "City", "Degree"]
+# unlabeled exports (batch scoring) may lack these; Profession is needed only by the training filters
+OPTIONAL = ["Profession", "Depression"]
+BAD_CITIES = {"3.0", "ME", "M.Com", "M.Tech", "City"}
+CITY_FIXES = {"Less Delhi": "Delhi", "Less than 5 Kalyan": "Kalyan"}
+YES_NO = {"Yes": 1, "No": 0}
+
+# column order of the notebook's cleaned frame (the model's feature order depends on it)
+CLEAN_COLUMNS = [
+    "id", "Gender", "Age", "City", "Profession", "Academic Pressure", "CGPA", "Study Satisfaction",
+    "Sleep Duration", "Dietary Habits", "Degree", SUICIDAL_Q, "Financial Stress", FAMILY_Q,
+    "Depression", "Suicidal Thoughts", "Fam_hist_ml",
+]
+
+
+def read_raw(path_or_buffer=DATA_PATH, **kwargs):
+    """Read the survey CSV with explicit dtypes (categoricals instead of object columns)."""
+    return pd.read_csv(path_or_buffer, dtype=RAW_DTYPES, **kwargs)
+
+
+def _recode(s, fixes=None):
+    """Strip quotes (and apply ``fixes``) once per category instead of once per row."""
+    s = s.astype("category")
+    cats = s.cat.categories.astype(str).str.replace(r"[\"']", "", regex=True)
+    if fixes:
+        cats = cats.map(lambda c: fixes.get(c, c))
+    uniq, inverse = np.unique(np.asarray(cats, dtype=object), return_inverse=True)
+    codes = s.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, inverse[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, uniq), index=s.index, name=s.name)
+
+
+def clean(raw, filters=True):
+    """Apply every notebook fix in one pass.
+
+    With ``filters=False`` only unusable rows (Financial Stress == '?') are dropped, which is
+    what batch scoring wants; the default also applies the notebook's training filters.
+    Columns in OPTIONAL are passed through only when ``raw`` has them.
+    """
+    if filters and "Profession" not in raw:
+        raise KeyError("the training filters need the 'Profession' column")
+    fixed = {c: _recode(raw[c], CITY_FIXES if c == "City" else None) for c in QUOTED if c in raw}
+    stress = pd.to_numeric(raw["Financial Stress"].astype(str), errors="coerce")
+
+    mask = stress.notna().to_numpy()
+    if filters:
+        mask = mask & (
+            (raw["CGPA"] != 0).to_numpy()
+            & ~fixed["City"].isin(BAD_CITIES).to_numpy()
+            & (raw["Study Satisfaction"].astype(int) != 0).to_numpy()
+            & (raw["Academic Pressure"].astype(int) != 0).to_numpy()
+            & (fixed["Profession"] == "Student").to_numpy()
+        )
+
+    def take(s):
+        s = s[mask]
+        return s.cat.remove_unused_categories() if isinstance(s.dtype, pd.CategoricalDtype) else s
+
+    out = pd.DataFrame({
+        "id": take(raw["id"]),
+        "Gender": take(raw["Gender"]),
+        "Age": take(raw["Age"]).astype(int),
+        "City": take(fixed["City"]),
+        "Academic Pressure": take(raw["Academic Pressure"]).astype(int),
+        "CGPA": take(raw["CGPA"]),
+        "Study Satisfaction": take(raw["Study Satisfaction"]).astype(int),
+        "Sleep Duration": take(fixed["Sleep Duration"]),
+        "Dietary Habits": take(raw["Dietary Habits"]),
+        "Degree": take(fixed["Degree"]),
+        SUICIDAL_Q: take(raw[SUICIDAL_Q]),
+        "Financial Stress": take(stress).astype(int),
+        FAMILY_Q: take(raw[FAMILY_Q]),
+    })
+    if "Profession" in fixed:
+        out["Profession"] = take(fixed["Profession"])
+    if "Depression" in raw:
+        out["Depression"] = take(raw["Depression"]).astype(int)
+    out["Suicidal Thoughts"] = out[SUICIDAL_Q].map(YES_NO).astype(int)
+    out["Fam_hist_ml"] = out[FAMILY_Q].map(YES_NO).astype(int)
+    return out[[c for c in CLEAN_COLUMNS if c in out]].reset_index(drop=True)
+
+
+# -----------------------------
+# Columnar cache
+# -----------------------------
+def _cache_path(path, cache_dir):
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{CLEANING_VERSION}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}.clean.{digest}.parquet")
+
+
+def load_clean(path=DATA_PATH, cache_dir=CACHE_DIR, use_cache=True):
+    """Cleaned survey frame, reusing the Parquet cache while the CSV is unchanged."""
+    if not use_cache:
+        return clean(read_raw(path))
+    cached = _cache_path(path, cache_dir)
+    if os.path.exists(cached):
+        return pd.read_parquet(cached)
+
+    data = clean(read_raw(path))
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = cached + ".tmp"
+    data.to_parquet(tmp, index=False)
+    os.replace(tmp, cached)
+    return data
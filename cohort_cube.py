@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Cohort risk cube over the cleaned survey
+(scores every student once with the model registry's served version, then keeps additive counts/sums per
+City x Degree x Gender x Sleep Duration x Dietary Habits cell; slices and roll-ups are sums over at most a few
+thousand cells, never the raw rows, and no figure is shown for fewer than MIN_COHORT students)
+
+Usage:
+    python cohort_cube.py                     # build or incrementally refresh .cache/cohort_cube
+    python cohort_cube.py --by Gender "Sleep Duration"
+    python cohort_cube.py --rebuild
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import model_registry
+from cleaning import CACHE_DIR, CLEANING_VERSION, DATA_PATH, load_clean
+from feature_schema import FEATURES
+from model_registry import REGISTRY_DIR
+from prediction_cache import PredictionCache
+
+CUBE_DIR = os.path.join(CACHE_DIR, "cohort_cube")
+DIMENSIONS = ["City", "Degree", "Gender", "Sleep Duration", "Dietary Habits"]
+# additive measures; rates are derived after rolling up
+MEASURES = ["students", "depressed", "risk_sum", "suicidal", "suicidal_depressed"]
+# k-anonymity: smaller cohorts are merged into OTHER (most cells of the full cube hold a single student)
+MIN_COHORT = 5
+OTHER = "Other (small cohorts)"
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [os.path.abspath(path), st.st_size, st.st_mtime_ns]
+
+
+def _model_stamp(registry):
+    """The registry version the apps serve (seeded from the legacy pickle on first use)."""
+    return [os.path.abspath(registry), model_registry.current(model_registry.ensure_registry(registry))]
+
+
+def _score(data, registry):
+    return PredictionCache(registry, maxsize=0).predict_proba(data[FEATURES])[:, 1]
+
+
+def merge_small(table, labels, measures, k=MIN_COHORT):
+    """Merge rows of ``table`` with fewer than ``k`` students into one row labelled OTHER in ``labels``.
+
+    While the merged row is still under ``k`` the next smallest rows join it, so no count under ``k``
+    is shown or can be recovered by subtracting the others from a total. A table under ``k`` in all
+    comes back empty.
+    """
+    counts = table["students"].sort_values(kind="stable")
+    if not len(counts) or counts.iloc[0] >= k:
+        return table
+    if counts.sum() < k:
+        return table.iloc[:0]
+    n = max(int((counts < k).sum()), int(np.searchsorted(counts.cumsum().to_numpy(), k)) + 1)
+    rows = table.loc[counts.index[:n]]
+    merged = rows[measures].sum().to_frame().T.astype(table[measures].dtypes.to_dict())
+    for c in table.columns.difference(measures):
+        merged[c] = OTHER if c in labels else rows[c].iloc[0]  # other columns are constant within ``table``
+    return pd.concat([table.drop(index=counts.index[:n]), merged[table.columns]], ignore_index=True)
+
+
+def aggregate(data, risk):
+    """Cube cells for a cleaned frame and its predicted probabilities."""
+    frame = pd.DataFrame({d: data[d].astype(str).to_numpy() for d in DIMENSIONS})
+    depressed = data["Depression"].to_numpy()
+    suicidal = data["Suicidal Thoughts"].to_numpy()
+    frame["students"] = 1
+    frame["depressed"] = depressed
+    frame["risk_sum"] = risk
+    frame["suicidal"] = suicidal
+    frame["suicidal_depressed"] = depressed & suicidal
+    return frame.groupby(DIMENSIONS, sort=False).sum().reset_index()
+
+
+class CohortCube:
+    """Aggregated cells plus the ids already counted (for incremental refresh)."""
+
+    def __init__(self, cells, ids, meta):
+        self.cells = cells
+        self.ids = ids
+        self.meta = meta
+
+    # --- build / persist ---
+    @classmethod
+    def build(cls, data_path=DATA_PATH, registry=REGISTRY_DIR):
+        data = load_clean(data_path)
+        meta = {"model": _model_stamp(registry), "data": _stamp(data_path), "cleaning": CLEANING_VERSION}
+        risk = _score(data, registry)
+        return cls(aggregate(data, risk), np.sort(data["id"].to_numpy()), meta)
+
+    def save(self, cube_dir=CUBE_DIR):
+        os.makedirs(cube_dir, exist_ok=True)
+        self.cells.to_parquet(os.path.join(cube_dir, "cells.parquet"), index=False)
+        np.save(os.path.join(cube_dir, "ids.npy"), self.ids)
+        with open(os.path.join(cube_dir, "meta.json"), "w") as f:
+            json.dump(self.meta, f)
+
+    @classmethod
+    def load(cls, cube_dir=CUBE_DIR):
+        with open(os.path.join(cube_dir, "meta.json")) as f:
+            meta = json.load(f)
+        return cls(pd.read_parquet(os.path.join(cube_dir, "cells.parquet")),
+                   np.load(os.path.join(cube_dir, "ids.npy")), meta)
+
+    def add_rows(self, data, risk):
+        """Fold newly scored rows into the cells (rows whose id is already counted are skipped)."""
+        new = ~np.isin(data["id"].to_numpy(), self.ids)
+        if not new.any():
+            return 0
+        data = data[new]
+        cells = pd.concat([self.cells, aggregate(data, risk[new])], ignore_index=True)
+        self.cells = cells.groupby(DIMENSIONS, sort=False).sum().reset_index()
+        self.ids = np.union1d(self.ids, data["id"].to_numpy())
+        return int(new.sum())
+
+    # --- queries ---
+    def query(self, by=(), min_students=MIN_COHORT, **filters):
+        """Roll up to the ``by`` dimensions over the cells matching ``filters`` (value or list of values).
+
+        Returns counts plus observed_rate (share with Depression = 1) and mean_risk (mean predicted probability).
+        Groups under ``min_students`` are merged into an OTHER row (see merge_small); a filtered total
+        under it is an empty frame.
+        """
+        cells = self.cells
+        for dim, values in filters.items():
+            values = [values] if isinstance(values, str) else list(values)
+            if values:
+                cells = cells[cells[dim].isin(values)]
+        by = list(by)
+        if by:
+            out = cells.groupby(by, sort=True)[MEASURES].sum().reset_index()
+        else:
+            out = cells[MEASURES].sum().to_frame().T
+        out = merge_small(out, by, MEASURES, min_students)
+        out["observed_rate"] = out["depressed"] / out["students"]
+        out["mean_risk"] = out["risk_sum"] / out["students"]
+        return out.drop(columns="risk_sum")
+
+    def sunburst(self, by="City", min_students=MIN_COHORT, **filters):
+        """Long frame of (by, Depression, Suicidal Thoughts, students) – the notebook's sunburst path.
+
+        Within each ``by`` group, Depression x Suicidal Thoughts leaves under ``min_students`` are merged
+        into an OTHER leaf the same way as in query.
+        """
+        t = self.query([by], min_students, **filters)
+        parts = {
+            (1, 1): t["suicidal_depressed"],
+            (1, 0): t["depressed"] - t["suicidal_depressed"],
+            (0, 1): t["suicidal"] - t["suicidal_depressed"],
+            (0, 0): t["students"] - t["depressed"] - t["suicidal"] + t["suicidal_depressed"],
+        }
+        frames = [pd.DataFrame({by: t[by], "Depression": d, "Suicidal Thoughts": s, "students": n})
+                  for (d, s), n in parts.items()]
+        out = pd.concat(frames, ignore_index=True)
+        out = out[out["students"] > 0].astype({"Depression": object, "Suicidal Thoughts": object})
+        leaves = ["Depression", "Suicidal Thoughts"]
+        merged = [merge_small(g, leaves, ["students"], min_students) for _, g in out.groupby(by, sort=False)]
+        return pd.concat(merged, ignore_index=True) if merged else out.reset_index(drop=True)
+
+    def values(self, dim):
+        return sorted(self.cells[dim].unique())
+
+
+def refresh(data_path=DATA_PATH, registry=REGISTRY_DIR, cube_dir=CUBE_DIR, rebuild=False):
+    """Load the cube, scoring and folding in only rows added since it was built.
+
+    A promotion in the registry or a new cleaning version rebuilds it, since every predicted risk would change.
+    """
+    try:
+        cube = None if rebuild else CohortCube.load(cube_dir)
+    except (OSError, ValueError):
+        cube = None
+    if cube is None or cube.meta["model"] != _model_stamp(registry) or cube.meta["cleaning"] != CLEANING_VERSION:
+        cube = CohortCube.build(data_path, registry)
+        cube.save(cube_dir)
+        return cube, "rebuilt"
+
+    if cube.meta["data"] == _stamp(data_path):
+        return cube, "unchanged"
+    data = load_clean(data_path)
+    fresh = ~np.isin(data["id"].to_numpy(), cube.ids)
+    if not fresh.any():
+        added = 0
+    else:
+        risk = np.zeros(len(data))
+        risk[fresh] = _score(data[fresh], registry)
+        added = cube.add_rows(data, risk)
+    cube.meta["data"] = _stamp(data_path)
+    cube.save(cube_dir)
+    return cube, f"added {added} rows"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--registry", default=REGISTRY_DIR, help="model registry whose CURRENT version scores the rows")
+    parser.add_argument("--by", nargs="*", default=["Gender"], choices=DIMENSIONS)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cube, status = refresh(args.data, args.registry, rebuild=args.rebuild)
+    print(f"cube {status}: {len(cube.cells)} cells, {len(cube.ids)} students ({time.perf_counter() - start:.2f}s)")
+    start = time.perf_counter()
+    result = cube.query(args.by)
+    print(result.to_string(index=False))
+    print(f"query: {(time.perf_counter() - start) * 1e3:.1f} ms")
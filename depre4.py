@@ -1,17 +1,36 @@
 # -*- coding: utf-8 -*-
 """
 Student Mental Wellness App – Gentle, Supportive, and Clear UI
-(uses existing trained model: Depression_predictor.pkl)
+(serves the current version of the model registry, see model_registry.py)
 """
 
+import time
+
 import streamlit as st
-import pandas as pd
-import joblib
+
+from instrumentation import METRICS
+from model_registry import ensure_registry
+from prediction_cache import PredictionCache
+from routing import ModelRouter
+from what_if import best_changes, describe, explore
 
 # -----------------------------
-# Load Model (kept exactly as is)
+# Load Model (one LRU-cached predictor shared by all sessions, behind the model router)
 # -----------------------------
-model = joblib.load("Depression_predictor.pkl")
+@st.cache_resource(show_spinner=False)
+def get_predictor():
+    # A/B candidate and shadow models come from DEPRESSION_AB_* / DEPRESSION_SHADOW_MODELS (see routing.py)
+    # the registry's CURRENT version; a promotion is picked up on the next prediction, no restart
+    return ModelRouter.from_env(PredictionCache(ensure_registry(), maxsize=4096))
+
+predictor = get_predictor()
+schema = predictor.schema  # allowed categories come from the fitted model
+
+FACTOR_LABELS = {
+    "Fam_hist_ml": "Family mental health history",
+    "Suicidal Thoughts": "Suicidal thoughts",
+    "CGPA": "CGPA",
+}
 
 # -----------------------------
 # Page Configuration
@@ -126,6 +145,140 @@ if "prediction_result" not in st.session_state:
 
 SAFE_NOTE = "Your information is safe and not recorded. This is a gentle guide — not a diagnosis."
 
+# -----------------------------
+# DETAILS SECTION (a form inside a fragment: widget changes don't rerun anything,
+# submitting reruns only this section – not the CSS, footer or model load)
+# -----------------------------
+@st.fragment
+def details_section():
+    with st.form("details_form", border=False):
+        st.markdown("<div class='card'>", unsafe_allow_html=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            gender = st.selectbox("Gender", schema.categories["Gender"], index=schema.index["Gender"]["Male"])
+            age = st.slider("Age", 15, 40, 20)
+
+            st.subheader("Academic Pressure")
+            st.markdown("<span class='helper'>On a scale of 1–5: 1 = low workload, 5 = very high workload/expectations.</span>", unsafe_allow_html=True)
+            academic_pressure = st.slider("", 1, 5, 3, key="ap")
+
+            cgpa = st.number_input("CGPA", min_value=0.0, max_value=10.0, step=0.1)
+
+            st.subheader("Study Satisfaction")
+            st.markdown("<span class='helper'>On a scale of 1–5: 1 = not satisfied with study time, 5 = very satisfied with study time.</span>", unsafe_allow_html=True)
+            study_satisfaction = st.slider("", 1, 5, 3, key="ss")
+
+        with col2:
+            sleep_duration = st.selectbox("Sleep Duration", schema.categories["Sleep Duration"])
+            diet = st.selectbox("Dietary Habits", schema.categories["Dietary Habits"])
+            degree = st.selectbox("Degree", schema.categories["Degree"])
+
+            st.subheader("Financial Stress")
+            st.markdown("<span class='helper'>On a scale of 1–5: 1 = low/no financial strain, 5 = severe financial pressure.</span>", unsafe_allow_html=True)
+            financial_stress = st.slider("", 1, 5, 3, key="fs")
+
+            suicidal = st.radio("Have you ever had suicidal thoughts?", ["No", "Yes"], horizontal=True)
+            fam_hist = st.radio("Is anyone in your family currently facing a mental health issue?", ["No", "Yes"], horizontal=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+        # --- Prediction ---
+        st.markdown("<div class='card'>", unsafe_allow_html=True)
+        st.markdown("<h3 style='color:#FFFFFF;'>🔎 Gentle Check-In</h3>", unsafe_allow_html=True)
+        st.caption(SAFE_NOTE)
+        submitted = st.form_submit_button("See My Reflections")
+
+    if submitted:
+        input_data = {
+            "Gender": gender,
+            "Age": age,
+            "Academic Pressure": academic_pressure,
+            "CGPA": cgpa,
+            "Study Satisfaction": study_satisfaction,
+            "Sleep Duration": sleep_duration,
+            "Dietary Habits": diet,
+            "Degree": degree,
+            "Financial Stress": financial_stress,
+            "Suicidal Thoughts": 1 if suicidal == "Yes" else 0,
+            "Fam_hist_ml": 1 if fam_hist == "Yes" else 0,
+        }
+        try:
+            # explanation and what-if come from the model that served this student (primary or A/B candidate)
+            _, served = predictor.route(input_data)
+            prediction, _ = predictor.predict(input_data)
+            st.session_state.predicted = True
+            st.session_state.prediction_result = prediction
+
+            n = st.session_state.name
+            if prediction == 1:
+                st.markdown("<p class='health-red'>⚠️ You may be at risk of depression.</p>", unsafe_allow_html=True)
+                st.markdown(
+                    f"""
+                    <div style='font-size:16px; line-height:1.7; color:#FFFFFF;'>
+                    {n}, I see you. I hear you. The weight you carry is real, and your feelings make sense. You do not have to hold it alone. 
+                    Consider talking with a trusted friend or family member, and if you can, reach out to a counselor or support line. 
+                    Try saying to yourself: <em>“This weight will not end me, I will emerge victorious.”</em> 
+                    Small steps are enough. You matter here. 🌿
+                    </div>
+                    """,
+                    unsafe_allow_html=True,
+                )
+            else:
+                st.markdown("<p class='health-green'>✅ You are not at risk of depression.</p>", unsafe_allow_html=True)
+                st.markdown(
+                    f"""
+                    <div style='font-size:16px; line-height:1.7; color:#FFFFFF;'>
+                    {n}, you’re doing a wonderful job balancing life and academics. Keep choosing rest, connection, and routines that nourish you. 
+                    If you ever feel yourself slowing down, pause, breathe, and choose you. Your well-being is worth protecting. 🌱
+                    </div>
+                    """,
+                    unsafe_allow_html=True,
+                )
+
+            # --- What shaped this reflection (SHAP contributions, in log-odds; tree models only) ---
+            explainer = served.explainer()  # SHAP tables are built when the model loads
+            if explainer is not None:
+                factors = explainer.explain(input_data, top=3)
+                lines = "".join(
+                    f"<li>{FACTOR_LABELS.get(f, f.capitalize())} – {'raised' if v > 0 else 'lowered'} the estimate</li>"
+                    for f, v in factors.items()
+                )
+                st.markdown(
+                    f"<div style='color:#FFFFFF;'><b>What shaped this reflection most:</b><ul>{lines}</ul>"
+                    "<span class='helper'>These are patterns the model learned, not judgements about you.</span></div>",
+                    unsafe_allow_html=True,
+                )
+
+            # --- What if…? (every combination of the changeable answers, scored in one batch) ---
+            with st.expander("🔄 What if things were a little different?"):
+                start = time.perf_counter()
+                scenarios = explore(served.schema, served, input_data)
+                elapsed_ms = (time.perf_counter() - start) * 1e3
+                for title, k in (("One small change", 1), ("Two changes together", 2)):
+                    best = best_changes(scenarios, max_changes=k, top=3)
+                    st.markdown(f"**{title}** that would lower the estimate most:")
+                    if best.empty:
+                        st.markdown("<span class='helper'>Nothing here would lower it further – keep going as you are. 🌱</span>", unsafe_allow_html=True)
+                    for _, s in best.iterrows():
+                        st.markdown(f"- {describe(s, input_data)} — about **{-s['delta'] * 100:.0f} points** lower")
+                st.caption(f"{len(scenarios):,} scenarios explored in {elapsed_ms:.0f} ms. " + SAFE_NOTE)
+        except Exception as e:
+            METRICS.inc("prediction_errors_total", app="depre4", error=type(e).__name__)
+            st.warning("We couldn’t complete the check-in. Please review your inputs and try again.")
+            st.text(str(e))
+
+    c_prev, c_next = st.columns(2)
+    with c_prev:
+        if st.button("⬅️ Back"):
+            st.session_state.page = "welcome_message"
+            st.rerun()
+    with c_next:
+        if st.session_state.predicted and st.button("Learn More About Depression →"):
+            st.session_state.page = "knowledge"
+            st.rerun()
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+
 # -----------------------------
 # OPENING PAGE
 # -----------------------------
@@ -190,97 +343,7 @@ elif st.session_state.page == "details":
     st.markdown("<h1 style='text-align:center; color:#FFFFFF;'>🌿 Your Details</h1>", unsafe_allow_html=True)
     st.markdown(f"<p style='text-align:center; font-size:16px; color:#80E7D8;'>Hi {n}, I’m glad you decided to do this. Please fill in correct information below. <br><em>{SAFE_NOTE}</em></p>", unsafe_allow_html=True)
 
-    st.markdown("<div class='card'>", unsafe_allow_html=True)
-    col1, col2 = st.columns(2)
-    with col1:
-        gender = st.selectbox("Gender", ["Male", "Female"])
-        age = st.slider("Age", 15, 40, 20)
-
-        st.subheader("Academic Pressure")
-        st.markdown("<span class='helper'>On a scale of 1–5: 1 = low workload, 5 = very high workload/expectations.</span>", unsafe_allow_html=True)
-        academic_pressure = st.slider("", 1, 5, 3, key="ap")
-
-        cgpa = st.number_input("CGPA", min_value=0.0, max_value=10.0, step=0.1)
-
-        st.subheader("Study Satisfaction")
-        st.markdown("<span class='helper'>On a scale of 1–5: 1 = not satisfied with study time, 5 = very satisfied with study time.</span>", unsafe_allow_html=True)
-        study_satisfaction = st.slider("", 1, 5, 3, key="ss")
-
-    with col2:
-        sleep_duration = st.selectbox("Sleep Duration", ["5-6 hours", "<5 hours", "7-8 hours", ">8 hours", "Others"])
-        diet = st.selectbox("Dietary Habits", ["Healthy", "Moderate", "Unhealthy", "Others"])
-        degree = st.selectbox("Degree", ["B.Sc", "BA", "BCA", "B.Tech", "M.Sc", "PhD", "Others"])
-
-        st.subheader("Financial Stress")
-        st.markdown("<span class='helper'>On a scale of 1–5: 1 = low/no financial strain, 5 = severe financial pressure.</span>", unsafe_allow_html=True)
-        financial_stress = st.slider("", 1, 5, 3, key="fs")
-
-        suicidal = st.radio("Have you ever had suicidal thoughts?", ["No", "Yes"], horizontal=True)
-        fam_hist = st.radio("Is anyone in your family currently facing a mental health issue?", ["No", "Yes"], horizontal=True)
-    st.markdown("</div>", unsafe_allow_html=True)
-
-    # --- Prediction ---
-    st.markdown("<div class='card'>", unsafe_allow_html=True)
-    st.markdown("<h3 style='color:#FFFFFF;'>🔎 Gentle Check-In</h3>", unsafe_allow_html=True)
-    st.caption(SAFE_NOTE)
-
-    if st.button("See My Reflections"):
-        input_data = pd.DataFrame({
-            "Gender": [gender],
-            "Age": [age],
-            "Academic Pressure": [academic_pressure],
-            "CGPA": [cgpa],
-            "Study Satisfaction": [study_satisfaction],
-            "Sleep Duration": [sleep_duration],
-            "Dietary Habits": [diet],
-            "Degree": [degree],
-            "Financial Stress": [financial_stress],
-            "Suicidal Thoughts": [1 if suicidal == "Yes" else 0],
-            "Fam_hist_ml": [1 if fam_hist == "Yes" else 0],
-        })
-        try:
-            prediction = model.predict(input_data)[0]
-            st.session_state.predicted = True
-            st.session_state.prediction_result = prediction
-
-            n = st.session_state.name
-            if prediction == 1:
-                st.markdown("<p class='health-red'>⚠️ You may be at risk of depression.</p>", unsafe_allow_html=True)
-                st.markdown(
-                    f"""
-                    <div style='font-size:16px; line-height:1.7; color:#FFFFFF;'>
-                    {n}, I see you. I hear you. The weight you carry is real, and your feelings make sense. You do not have to hold it alone. 
-                    Consider talking with a trusted friend or family member, and if you can, reach out to a counselor or support line. 
-                    Try saying to yourself: <em>“This weight will not end me, I will emerge victorious.”</em> 
-                    Small steps are enough. You matter here. 🌿
-                    </div>
-                    """,
-                    unsafe_allow_html=True,
-                )
-            else:
-                st.markdown("<p class='health-green'>✅ You are not at risk of depression.</p>", unsafe_allow_html=True)
-                st.markdown(
-                    f"""
-                    <div style='font-size:16px; line-height:1.7; color:#FFFFFF;'>
-                    {n}, you’re doing a wonderful job balancing life and academics. Keep choosing rest, connection, and routines that nourish you. 
-                    If you ever feel yourself slowing down, pause, breathe, and choose you. Your well-being is worth protecting. 🌱
-                    </div>
-                    """,
-                    unsafe_allow_html=True,
-                )
-        except Exception as e:
-            st.warning("We couldn’t complete the check-in. Please review your inputs and try again.")
-            st.text(str(e))
-
-    c_prev, c_next = st.columns(2)
-    with c_prev:
-        if st.button("⬅️ Back"):
-            st.session_state.page = "welcome_message"
-    with c_next:
-        if st.session_state.predicted and st.button("Learn More About Depression →"):
-            st.session_state.page = "knowledge"
-
-    st.markdown("</div>", unsafe_allow_html=True)
+    details_section()
 
 # -----------------------------
 # KNOWLEDGE PAGE
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+Per-prediction explanations for the deployed GBM
+(exact path-dependent TreeSHAP, precomputed per tree at load time, rolled back up to the 11 survey inputs)
+
+Every tree's SHAP values depend on a row only through which way it goes at each split, so for trees
+with <= 8 splits (max_depth 3) they are tabulated once for all 256 split-outcome bytes – the same
+codes fast_scorer uses for scoring – and only for the columns the tree splits on (a few per tree).
+Explaining a row is then one table lookup per tree and column.
+
+Usage:
+    python explainer.py check               # compare against shap.TreeExplainer (or a reference TreeSHAP)
+    python explainer.py explain --row '{"Gender": "Male", "Age": 21, ...}'
+"""
+
+import argparse
+import json
+import math
+import time
+
+import numpy as np
+
+from fast_scorer import COMPILED_PATH, MODEL_PATH, FastScorer, flatten_pipeline, load_compiled, random_inputs
+
+
+# -----------------------------
+# Shapley values of one tree
+# -----------------------------
+def _tree_phi(tree, go_left):
+    """Exact SHAP values of one tree for k split-outcome patterns.
+
+    ``tree`` is (root, split_nodes, feature, left, right, value, cover), ``go_left``
+    a (n_splits, k) bool array. E[f | x_S] is the cover-weighted expectation TreeExplainer uses
+    (follow x at splits on features in S, average over both children otherwise); Shapley values are
+    taken by enumerating subsets of the tree's own features, which is cheap for shallow trees.
+    Returns (features, phi of shape (n_features, k), expected value).
+    """
+    root, splits, feature, left, right, value, cover = tree
+    slot = {node: j for j, node in enumerate(splits)}
+    players, player = np.unique(feature[splits], return_inverse=True)
+    player = dict(zip(splits, player.ravel()))
+    m, k = len(players), go_left.shape[1]
+    subsets = np.arange(1 << m)[:, None]
+
+    E = np.zeros((1 << m, k))
+    stack = [(root, [])]
+    while stack:
+        node, path = stack.pop()
+        if node not in slot:
+            term = np.full((1 << m, k), value[node])
+            for parent, went_left in path:
+                child = left[parent] if went_left else right[parent]
+                in_s = (subsets >> player[parent]) & 1
+                hot = go_left[slot[parent]] == went_left
+                term *= np.where(in_s == 1, hot, cover[child] / cover[parent])
+            E += term
+            continue
+        stack.append((left[node], path + [(node, True)]))
+        stack.append((right[node], path + [(node, False)]))
+
+    size = np.array([bin(s).count("1") for s in range(1 << m)])
+    weight = np.array([math.factorial(s) * math.factorial(m - s - 1) / math.factorial(m) if s < m else 0.0
+                       for s in range(m + 1)])
+    phi = np.empty((m, k))
+    for p in range(m):
+        without = np.flatnonzero(((subsets[:, 0] >> p) & 1) == 0)
+        phi[p] = weight[size[without]] @ (E[without | (1 << p)] - E[without])
+    return players, phi, E[0, 0]
+
+
+# -----------------------------
+# Explainer
+# -----------------------------
+class FastExplainer:
+    """SHAP values of ``decision_function`` (log-odds) per survey input, NumPy only."""
+
+    def __init__(self, arrays):
+        if "cover" not in arrays:
+            raise KeyError("compiled model has no node covers – re-run `python fast_scorer.py export`")
+        self.scorer = s = FastScorer(arrays)
+        self.feature_names = s.feature_names
+        cover = np.asarray(arrays["cover"], dtype=np.float64)
+
+        # transformed column -> survey input it came from
+        self.column_input = np.empty(s.n_features, dtype=np.int64)
+        for i, c in enumerate(s.num_cols):
+            self.column_input[i] = self.feature_names.index(c)
+        for c, table in s.cat_index.items():
+            self.column_input[list(table.values())] = self.feature_names.index(c)
+
+        n_nodes = len(s.left)
+        internal = s.left != np.arange(n_nodes)
+        ends = np.append(s.roots[1:], n_nodes)
+        self._trees = [(r, r + np.flatnonzero(internal[r:e]), s.feature, s.left, s.right, s.value, cover)
+                       for r, e in zip(s.roots, ends)]
+
+        expected = 0.0
+        if s._tables is not None:
+            # one (players, 256) table per tree: learning_rate * SHAP value of each column the tree
+            # splits on, per split-outcome byte; stacked, ordered by column for a reduceat roll-up
+            go_left = ((np.arange(256)[None, :] >> np.arange(8)[:, None]) & 1) == 1
+            tables, columns, trees = [], [], []
+            for t, tree in enumerate(self._trees):
+                players, phi, base = _tree_phi(tree, go_left[:len(tree[1])])
+                tables.append(s.learning_rate * phi)
+                columns.append(players)
+                trees.append(np.full(len(players), t))
+                expected += s.learning_rate * base
+            columns, trees = np.concatenate(columns), np.concatenate(trees)
+            order = np.argsort(columns, kind="stable")
+            self._tables = np.concatenate(tables)[order].ravel()
+            self._table_tree = trees[order]
+            self._table_base = np.arange(len(order)) * 256
+            self._table_columns, self._table_starts = np.unique(columns[order], return_index=True)
+        else:
+            self._tables = None
+            for tree in self._trees:
+                expected += s.learning_rate * _tree_phi(tree, np.ones((len(tree[1]), 1), dtype=bool))[2]
+        self.expected_value = s.init_raw + expected
+
+    @classmethod
+    def load(cls, path=COMPILED_PATH, model_path=None):
+        return cls(load_compiled(path, model_path))
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        return cls(flatten_pipeline(pipeline))
+
+    def column_values(self, X, block=512):
+        """SHAP values per transformed column for an already transformed float32 matrix."""
+        s, n = self.scorer, X.shape[0]
+        out = np.zeros((n, s.n_features))
+        if self._tables is not None:
+            for a in range(0, n, block):
+                codes = s._codes(X[a:a + block]).astype(np.int64)
+                values = self._tables[self._table_base + codes[:, self._table_tree]]
+                out[a:a + block, self._table_columns] = np.add.reduceat(values, self._table_starts, axis=1)
+            return out
+
+        # deeper trees: same computation with the rows' own split outcomes
+        for tree in self._trees:
+            splits = tree[1]
+            if not len(splits):
+                continue
+            go_left = (X[:, s.feature[splits]] <= s.threshold[splits]).T
+            players, phi, _ = _tree_phi(tree, go_left)
+            out[:, players] += s.learning_rate * phi.T
+        return out
+
+    def shap_values(self, rows, rollup=True):
+        """(n, 11) contributions per survey input (``rollup=False``: per transformed column).
+
+        Each row's values sum to ``decision_function(row) - expected_value``.
+        """
+        values = self.column_values(self.scorer.transform(rows))
+        if not rollup:
+            return values
+        out = np.zeros((values.shape[0], len(self.feature_names)))
+        np.add.at(out.T, self.column_input, values.T)
+        return out
+
+    def explain(self, row, top=None):
+        """{input: contribution} for one row, largest effect first."""
+        contrib = self.shap_values(row)[0]
+        order = np.argsort(-np.abs(contrib), kind="stable")[:top]
+        return {self.feature_names[i]: float(contrib[i]) for i in order}
+
+
+# -----------------------------
+# Check
+# -----------------------------
+def _reference_tree_shap(tree, threshold, x, phi):
+    """Algorithm 2 of Lundberg et al. (2018), one row at a time – independent of the subset enumeration."""
+    root, splits, feature, left, right, value, cover = tree
+    is_split = set(splits.tolist())
+
+    def extend(path, zero, one, feat):
+        path = [list(p) for p in path] + [[feat, zero, one, 1.0 if not path else 0.0]]
+        d = len(path) - 1
+        for i in range(d - 1, -1, -1):
+            path[i + 1][3] += one * path[i][3] * (i + 1) / (d + 1)
+            path[i][3] = zero * path[i][3] * (d - i) / (d + 1)
+        return path
+
+    def unwind(path, idx):
+        d = len(path) - 1
+        _, zero, one, _ = path[idx]
+        path = [list(p) for p in path]
+        nxt = path[d][3]
+        for i in range(d - 1, -1, -1):
+            if one != 0:
+                tmp = path[i][3]
+                path[i][3] = nxt * (d + 1) / ((i + 1) * one)
+                nxt = tmp - path[i][3] * zero * (d - i) / (d + 1)
+            else:
+                path[i][3] = path[i][3] * (d + 1) / (zero * (d - i))
+        for i in range(idx, d):
+            path[i][:3] = path[i + 1][:3]
+        return path[:-1]
+
+    def unwound_sum(path, idx):
+        d = len(path) - 1
+        _, zero, one, _ = path[idx]
+        nxt, total = path[d][3], 0.0
+        for i in range(d - 1, -1, -1):
+            if one != 0:
+                tmp = nxt * (d + 1) / ((i + 1) * one)
+                total += tmp
+                nxt = path[i][3] - tmp * zero * (d - i) / (d + 1)
+            else:
+                total += path[i][3] / zero / ((d - i) / (d + 1))
+        return total
+
+    def recurse(node, path, zero, one, feat):
+        path = extend(path, zero, one, feat)
+        if node not in is_split:
+            for i in range(1, len(path)):
+                phi[path[i][0]] += unwound_sum(path, i) * (path[i][2] - path[i][1]) * value[node]
+            return
+        f = feature[node]
+        hot, cold = (left[node], right[node]) if x[f] <= threshold[node] else (right[node], left[node])
+        in_zero = in_one = 1.0
+        for i, p in enumerate(path):
+            if p[0] == f:
+                in_zero, in_one = p[1], p[2]
+                path = unwind(path, i)
+                break
+        recurse(hot, path, cover[hot] / cover[node] * in_zero, in_one, f)
+        recurse(cold, path, cover[cold] / cover[node] * in_zero, 0.0, f)
+
+    recurse(root, [], 1.0, 1.0, -1)
+
+
+def check(model_path=MODEL_PATH, compiled_path=COMPILED_PATH, n=500):
+    """Max abs difference to shap.TreeExplainer (reference TreeSHAP if shap isn't installed), additivity and speed."""
+    import joblib
+    import pandas as pd
+
+    explainer = FastExplainer.load(compiled_path, model_path)
+    s = explainer.scorer
+    df = pd.DataFrame(random_inputs(s, n))[s.feature_names]
+    X = s.transform(df)
+    ours = explainer.column_values(X)
+
+    try:
+        import shap
+
+        gbm = joblib.load(model_path).named_steps["model"]
+        ref = shap.TreeExplainer(gbm).shap_values(X.astype(np.float64))
+        source = "shap.TreeExplainer"
+    except ImportError:
+        ref = np.zeros_like(ours)
+        for i in range(n):
+            for tree in explainer._trees:
+                phi = np.zeros(s.n_features)
+                _reference_tree_shap(tree, s.threshold, X[i], phi)
+                ref[i] += s.learning_rate * phi
+        source = "reference TreeSHAP"
+
+    additivity = np.abs(explainer.shap_values(df).sum(axis=1) + explainer.expected_value
+                        - s.decision_function(df)).max()
+    rows = df.to_dict("records")
+    start = time.perf_counter()
+    for row in rows:
+        explainer.explain(row)
+    per_row = (time.perf_counter() - start) / len(rows)
+    start = time.perf_counter()
+    explainer.shap_values(df)
+    batch = (time.perf_counter() - start) / len(rows)
+    return {"against": source, "max_abs_diff": float(np.abs(ours - ref).max()),
+            "additivity_error": float(additivity), "single_row_ms": per_row * 1e3, "batch_row_us": batch * 1e6}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["check", "explain"])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--compiled", default=COMPILED_PATH)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--row", help="JSON object with the 11 inputs (explain)")
+    args = parser.parse_args()
+
+    if args.command == "explain":
+        explainer = FastExplainer.load(args.compiled, args.model)
+        print(f"expected value (log-odds): {explainer.expected_value:+.4f}")
+        for name, value in explainer.explain(json.loads(args.row)).items():
+            print(f"{name:<20} {value:+.4f}")
+    else:
+        result = check(args.model, args.compiled, args.rows)
+        print(json.dumps(result, indent=2))
+        raise SystemExit(0 if result["max_abs_diff"] < 1e-9 and result["additivity_error"] < 1e-9 else 1)
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+Compiled scorer for Depression_predictor.pkl
+(flattens the fitted pipeline into plain NumPy arrays – no sklearn/imblearn at runtime)
+
+Usage:
+    python fast_scorer.py export            # Depression_predictor.pkl -> Depression_predictor.npz
+                                            # (records the .pkl's sha256; loading refuses a stale export)
+    python fast_scorer.py check             # parity against model.predict_proba
+"""
+
+import argparse
+import hashlib
+import math
+import os
+from collections.abc import Mapping
+
+import numpy as np
+
+MODEL_PATH = "Depression_predictor.pkl"
+COMPILED_PATH = "Depression_predictor.npz"
+
+# libm exp, to match scipy.special.expit bit for bit (numpy's SIMD exp can differ by 1 ulp)
+_exp = np.frompyfunc(math.exp, 1, 1)
+
+
+# -----------------------------
+# Export (needs sklearn – run once after training)
+# -----------------------------
+def flatten_preprocessor(pre):
+    """Columns, scaler constants and categories of the fitted ColumnTransformer (any learner after it)."""
+    num = pre.named_transformers_["num"].named_steps["scaler"]
+    enc = pre.named_transformers_["cat"].named_steps["encoder"]
+    return {
+        "feature_names": np.array(list(pre.feature_names_in_), dtype=str),
+        "num_cols": np.array([c for name, _, cols in pre.transformers_ if name == "num" for c in cols], dtype=str),
+        "mean": np.asarray(num.mean_, dtype=np.float64),
+        "scale": np.asarray(num.scale_, dtype=np.float64),
+        "cat_cols": np.array([c for name, _, cols in pre.transformers_ if name == "cat" for c in cols], dtype=str),
+        "cat_sizes": np.array([len(c) for c in enc.categories_], dtype=np.int64),
+        "categories": np.array([str(v) for c in enc.categories_ for v in c], dtype=str),
+    }
+
+
+def compilable(pipeline):
+    """True if flatten_pipeline can represent the learner (a binary GradientBoostingClassifier)."""
+    from sklearn.ensemble import GradientBoostingClassifier
+
+    gbm = pipeline.steps[-1][1]
+    return isinstance(gbm, GradientBoostingClassifier) and len(gbm.classes_) == 2
+
+
+def flatten_pipeline(pipeline):
+    """Return a dict of NumPy arrays describing the fitted preprocessor + GBM."""
+    if not compilable(pipeline):
+        raise TypeError(f"can't compile a {type(pipeline.steps[-1][1]).__name__}, only GradientBoostingClassifier")
+    pre = flatten_preprocessor(pipeline.named_steps["preprocessor"])
+    gbm = pipeline.steps[-1][1]
+
+    # one flat node table for all trees; leaves loop back to themselves
+    trees = [est.tree_ for est in gbm.estimators_[:, 0]]
+    offsets = np.cumsum([0] + [t.node_count for t in trees])
+    feature, threshold, left, right, value, cover = [], [], [], [], [], []
+    for off, t in zip(offsets, trees):
+        ids = np.arange(t.node_count) + off
+        leaf = t.children_left == -1
+        feature.append(np.where(leaf, 0, t.feature))
+        threshold.append(np.where(leaf, np.inf, t.threshold))
+        left.append(np.where(leaf, ids, t.children_left + off))
+        right.append(np.where(leaf, ids, t.children_right + off))
+        value.append(t.value[:, 0, 0])
+        cover.append(t.weighted_n_node_samples)
+
+    # constant for the prior-based DummyClassifier init
+    probe = np.zeros((1, len(pre["num_cols"]) + int(pre["cat_sizes"].sum())))
+    init_raw = float(gbm._raw_predict_init(probe.astype(np.float32))[0, 0])
+
+    return {
+        **pre,
+        "roots": offsets[:-1].astype(np.int64),
+        "feature": np.concatenate(feature).astype(np.int64),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "left": np.concatenate(left).astype(np.int64),
+        "right": np.concatenate(right).astype(np.int64),
+        "value": np.concatenate(value).astype(np.float64),
+        "cover": np.concatenate(cover).astype(np.float64),  # training rows per node (explainer.py)
+        "max_depth": np.array(max(t.max_depth for t in trees), dtype=np.int64),
+        "learning_rate": np.array(gbm.learning_rate, dtype=np.float64),
+        "init_raw": np.array(init_raw, dtype=np.float64),
+        "classes": np.asarray(gbm.classes_),
+    }
+
+
+class StaleExportError(ValueError):
+    """The compiled .npz wasn't exported from the pickle it sits next to."""
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def export(model_path=MODEL_PATH, out_path=COMPILED_PATH):
+    import joblib
+
+    np.savez(out_path, **flatten_pipeline(joblib.load(model_path)), source_sha256=np.array(file_sha256(model_path)))
+    return out_path
+
+
+def load_compiled(path=COMPILED_PATH, model_path=None):
+    """Arrays of an exported .npz, checked against the pickle it was exported from.
+
+    ``model_path`` defaults to the .pkl next to the .npz (where train.py / update.py write both); if
+    it exists and its sha256 differs from the one recorded at export, StaleExportError is raised
+    instead of silently scoring with an out-of-date model.
+    """
+    model_path = model_path or os.path.splitext(path)[0] + ".pkl"
+    with np.load(path) as npz:
+        arrays = dict(npz)
+    recorded = str(arrays.pop("source_sha256", ""))
+    if os.path.exists(model_path) and recorded != file_sha256(model_path):
+        raise StaleExportError(f"{path} was not exported from the current {model_path} – "
+                               f"re-run `python fast_scorer.py export --model {model_path} --out {path}`")
+    return arrays
+
+
+# -----------------------------
+# Runtime (NumPy only)
+# -----------------------------
+class FastScorer:
+    """Scores raw survey inputs exactly like ``pipeline.predict_proba``."""
+
+    def __init__(self, arrays):
+        a = {k: np.asarray(v) for k, v in arrays.items()}
+        self.feature_names = [str(c) for c in a["feature_names"]]
+        self.num_cols = [str(c) for c in a["num_cols"]]
+        self.cat_cols = [str(c) for c in a["cat_cols"]]
+        self.mean, self.scale = a["mean"], a["scale"]
+
+        # category -> output column, laid out after the numeric block
+        self.cat_index = {}
+        pos, col = 0, len(self.num_cols)
+        for name, size in zip(self.cat_cols, a["cat_sizes"]):
+            cats = [str(v) for v in a["categories"][pos:pos + size]]
+            self.cat_index[name] = {v: col + i for i, v in enumerate(cats)}
+            pos += size
+            col += size
+        self.n_features = col
+
+        self.roots = a["roots"]
+        self.feature, self.threshold = a["feature"], a["threshold"]
+        self.left, self.right, self.value = a["left"], a["right"], a["value"]
+        self.max_depth = int(a["max_depth"])
+        self.learning_rate = float(a["learning_rate"])
+        self.init_raw = float(a["init_raw"])
+        self.classes_ = a["classes"]
+        self._build_code_tables()
+
+    def _build_code_tables(self):
+        """For trees with <= 8 splits, map the byte of split outcomes straight to the scaled leaf value.
+
+        Scoring then needs one compare per distinct (feature, threshold) pair and one table lookup
+        per tree instead of walking nodes. Deeper trees fall back to the node walk.
+        """
+        n_nodes, n_trees = len(self.left), len(self.roots)
+        internal = self.left != np.arange(n_nodes)
+        ends = np.append(self.roots[1:], n_nodes)
+        if max(internal[r:e].sum() for r, e in zip(self.roots, ends)) > 8:
+            self._tables = None
+            return
+
+        # slot j of tree t holds its j-th split; unused slots compare against +inf (always true)
+        slot = np.zeros(n_nodes, dtype=np.int64)
+        slot_feature = np.zeros((n_trees, 8), dtype=np.int64)
+        slot_threshold = np.full((n_trees, 8), np.inf)
+        for t, (r, e) in enumerate(zip(self.roots, ends)):
+            ids = r + np.flatnonzero(internal[r:e])
+            slot[ids] = np.arange(len(ids))
+            slot_feature[t, :len(ids)] = self.feature[ids]
+            slot_threshold[t, :len(ids)] = self.threshold[ids]
+
+        # float32 x <= float64 t  <=>  x <= largest float32 not above t
+        thr32 = slot_threshold.astype(np.float32)
+        above = thr32.astype(np.float64) > slot_threshold
+        thr32[above] = np.nextafter(thr32[above], np.float32(-np.inf))
+        pairs = np.stack([slot_feature.ravel(), thr32.ravel().view(np.uint32).astype(np.int64)], axis=1)
+        uniq, self._slot_pair = np.unique(pairs, axis=0, return_inverse=True)
+        self._slot_pair = self._slot_pair.ravel()
+        self._pair_feature = uniq[:, 0]
+        self._pair_threshold = uniq[:, 1].astype(np.uint32).view(np.float32)
+
+        # walk every tree once for each of the 256 possible outcome bytes
+        codes = np.arange(256)
+        node = np.repeat(self.roots[:, None], 256, axis=1)
+        for _ in range(self.max_depth):
+            split = internal[node]
+            bit = (codes >> np.where(split, slot[node], 0)) & 1
+            node = np.where(split, np.where(bit == 1, self.left[node], self.right[node]), node)
+        self._tables = (self.learning_rate * self.value[node]).ravel()
+        self._table_offset = np.arange(n_trees) * 256
+        self._bit_weights = (1 << np.arange(8)).astype(np.uint8)
+
+    @classmethod
+    def load(cls, path=COMPILED_PATH, model_path=None):
+        return cls(load_compiled(path, model_path))
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        return cls(flatten_pipeline(pipeline))
+
+    # --- input handling ---
+    def _columns(self, rows):
+        """Normalise dict / list of dicts / DataFrame / 2-D array into column arrays."""
+        if isinstance(rows, Mapping) or hasattr(rows, "columns"):
+            return {c: np.atleast_1d(np.asarray(rows[c], dtype=object)) for c in self.feature_names}
+        if isinstance(rows, (list, tuple)) and rows and isinstance(rows[0], Mapping):
+            return {c: np.array([r[c] for r in rows], dtype=object) for c in self.feature_names}
+        arr = np.atleast_2d(np.asarray(rows, dtype=object))
+        return {c: arr[:, i] for i, c in enumerate(self.feature_names)}
+
+    @staticmethod
+    def _lookup(table, values):
+        if len(values) <= 64:
+            return np.array([table.get(str(v), -1) for v in values], dtype=np.int64)
+        uniq, inverse = np.unique(values.astype(str), return_inverse=True)
+        return np.array([table.get(u, -1) for u in uniq], dtype=np.int64)[inverse.ravel()]
+
+    def _transform_one(self, row):
+        x = np.zeros((1, self.n_features), dtype=np.float64)
+        x[0, :len(self.num_cols)] = (np.array([float(row[c]) for c in self.num_cols]) - self.mean) / self.scale
+        for c in self.cat_cols:
+            j = self.cat_index[c].get(str(row[c]))
+            if j is not None:
+                x[0, j] = 1.0
+        return x.astype(np.float32)
+
+    def transform(self, rows):
+        """Scaled + one-hot feature matrix (float32, as the GBM sees it)."""
+        if isinstance(rows, Mapping) and np.ndim(rows[self.feature_names[0]]) == 0:
+            return self._transform_one(rows)  # single dict row, the apps' hot path
+        cols = self._columns(rows)
+        num = np.array([cols[c] for c in self.num_cols], dtype=np.float64).T
+        X = np.zeros((num.shape[0], self.n_features), dtype=np.float64)
+        X[:, :len(self.num_cols)] = (num - self.mean) / self.scale
+        for c in self.cat_cols:
+            idx = self._lookup(self.cat_index[c], cols[c])
+            hit = idx >= 0  # unknown categories stay all-zero (handle_unknown='ignore')
+            X[np.flatnonzero(hit), idx[hit]] = 1.0
+        return X.astype(np.float32)
+
+    # --- scoring ---
+    def _stage_values(self, X, block=512):
+        """learning_rate * leaf value, shaped (tree, row)."""
+        n, n_trees = X.shape[0], len(self.roots)
+        if self._tables is None:
+            node = np.broadcast_to(self.roots, (n, n_trees)).copy()
+            r = np.arange(n)[:, None]
+            for _ in range(self.max_depth):
+                go_left = X[r, self.feature[node]] <= self.threshold[node]
+                node = np.where(go_left, self.left[node], self.right[node])
+            return (self.learning_rate * self.value[node]).T
+
+        out = np.empty((n_trees, n), dtype=np.float64)
+        for a in range(0, n, block):
+            out[:, a:a + block] = self._tables[self._table_offset + self._codes(X[a:a + block])].T
+        return out
+
+    def _codes(self, X):
+        """Byte of split outcomes per (row, tree); bit j set = went left at the tree's j-th split."""
+        passed = (X[:, self._pair_feature] <= self._pair_threshold).view(np.uint8)
+        bits = passed[:, self._slot_pair].reshape(-1, len(self.roots), 8)
+        return (bits * self._bit_weights).sum(axis=2, dtype=np.uint8)
+
+    def decision_function(self, rows):
+        return self._decision(self.transform(rows))
+
+    def _decision(self, X):
+        stages = self._stage_values(X)
+        # same summation order as sklearn's predict_stages: init, then stage by stage
+        if X.shape[0] <= 32:
+            steps = np.vstack([np.full((1, X.shape[0]), self.init_raw), stages])
+            return np.add.accumulate(steps, axis=0)[-1]
+        raw = np.full(X.shape[0], self.init_raw)
+        for stage in stages:
+            raw += stage
+        return raw
+
+    def predict_proba(self, rows):
+        return self.predict_proba_encoded(self.transform(rows))
+
+    def predict_proba_encoded(self, X):
+        """predict_proba for an already transformed float32 matrix (transform() / FeatureSchema.encode)."""
+        raw = self._decision(X)
+        proba = np.empty((raw.shape[0], 2), dtype=np.float64)
+        proba[:, 1] = 1.0 / (1.0 + _exp(-raw).astype(np.float64))
+        proba[:, 0] = 1 - proba[:, 1]
+        return proba
+
+    def predict(self, rows):
+        return self.classes_[(self.decision_function(rows) >= 0).astype(int)]
+
+
+# -----------------------------
+# Parity check
+# -----------------------------
+def random_inputs(scorer, n, seed=0):
+    """Random app-shaped inputs, including a few categories the encoder never saw."""
+    rng = np.random.default_rng(seed)
+    rows = {
+        "Age": rng.integers(15, 41, n),
+        "Academic Pressure": rng.integers(1, 6, n),
+        # the app's 0.1 steps and the survey's two-decimal grades
+        "CGPA": np.where(rng.random(n) < 0.5, np.round(rng.uniform(0, 10, n), 1), np.round(rng.uniform(0, 10, n), 2)),
+        "Study Satisfaction": rng.integers(1, 6, n),
+        "Financial Stress": rng.integers(1, 6, n),
+        "Suicidal Thoughts": rng.integers(0, 2, n),
+        "Fam_hist_ml": rng.integers(0, 2, n),
+    }
+    for c in scorer.cat_cols:
+        choices = list(scorer.cat_index[c]) + ["<unseen>"]
+        rows[c] = rng.choice(choices, n)
+    return rows
+
+
+def check_parity(model_path=MODEL_PATH, compiled_path=COMPILED_PATH, n=20000):
+    import joblib
+    import pandas as pd
+
+    model = joblib.load(model_path)
+    scorer = FastScorer.load(compiled_path, model_path)
+    df = pd.DataFrame(random_inputs(scorer, n))[scorer.feature_names]
+
+    expected = model.predict_proba(df)
+    batch = scorer.predict_proba(df)
+    single = np.vstack([scorer.predict_proba(df.iloc[i].to_dict()) for i in range(min(n, 500))])
+    return np.array_equal(expected, batch) and np.array_equal(expected[:len(single)], single)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["export", "check"])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--out", default=COMPILED_PATH)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        print("Wrote", export(args.model, args.out))
+    else:
+        ok = check_parity(args.model, args.out, args.rows)
+        print("Bit-identical to predict_proba:", ok)
+        raise SystemExit(0 if ok else 1)
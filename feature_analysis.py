@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Feature relevance for the cleaned survey: chi2, mutual information, permutation importance on the
+fitted Gradmodel and RFE ranking
+(the data is encoded once – label codes as in Health.ipynb plus the model's own feature matrix – and
+every method reuses it; the expensive parts run on all cores)
+
+Usage:
+    python feature_analysis.py                        # all methods, table + timings
+    python feature_analysis.py --methods chi2 mi --json relevance.json
+"""
+
+import argparse
+import json
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_selection import RFE, chi2, mutual_info_classif
+from sklearn.metrics import roc_auc_score
+
+from feature_schema import FEATURES
+from train import DATA_PATH, MODEL_PATH, load_features
+
+METHODS = ["chi2", "mi", "permutation", "rfe"]
+
+
+# -----------------------------
+# Shared matrices
+# -----------------------------
+def prepare(data_path=DATA_PATH, model_path=MODEL_PATH):
+    """Encode the survey once for every method.
+
+    ``codes``: per-column label codes (the notebook's LabelEncoder loop, vectorized).
+    ``X``/``groups``: the fitted preprocessor's matrix and, per input, its column indices.
+    """
+    x, y = load_features(data_path)
+    x = x[FEATURES]
+    codes = np.column_stack([np.unique(x[c].astype(str) if x[c].dtype.kind not in "biuf" else x[c],
+                                       return_inverse=True)[1].ravel() for c in FEATURES])
+    model = joblib.load(model_path)
+    pre = model.named_steps["preprocessor"]
+    X = np.asarray(pre.transform(x), dtype=np.float32)
+    out_names = list(pre.get_feature_names_out())
+    groups = [[j for j, n in enumerate(out_names) if n == f"num__{c}" or n.startswith(f"cat__{c}_")] for c in FEATURES]
+    return {"codes": codes, "discrete": np.array([x[c].dtype.kind not in "f" for c in FEATURES]),
+            "X": X, "groups": groups, "y": y.to_numpy(), "estimator": model.steps[-1][1]}
+
+
+# -----------------------------
+# Methods
+# -----------------------------
+def chi2_scores(m):
+    scores, p = chi2(m["codes"], m["y"])
+    return {"chi2": scores, "chi2_p": p}
+
+
+def mutual_information(m, n_jobs=-1):
+    mi = mutual_info_classif(m["codes"], m["y"], discrete_features=m["discrete"], random_state=42, n_jobs=n_jobs)
+    return {"mutual_info": mi}
+
+
+def _permuted_auc(estimator, X, y, cols, seeds):
+    out = []
+    for seed in seeds:
+        Xp = X.copy()
+        Xp[:, cols] = X[np.random.default_rng(seed).permutation(len(X))][:, cols]
+        out.append(roc_auc_score(y, estimator.predict_proba(Xp)[:, 1]))
+    return out
+
+
+def permutation_importance(m, n_repeats=5, n_jobs=-1):
+    """ROC AUC lost when an input (all of its one-hot columns together) is shuffled."""
+    estimator, X, y = m["estimator"], m["X"], m["y"]
+    base = roc_auc_score(y, estimator.predict_proba(X)[:, 1])
+    seeds = list(range(n_repeats))
+    aucs = joblib.Parallel(n_jobs=n_jobs)(
+        joblib.delayed(_permuted_auc)(estimator, X, y, cols, seeds) for cols in m["groups"]
+    )
+    drops = base - np.array(aucs)
+    return {"permutation_auc_drop": drops.mean(axis=1), "permutation_std": drops.std(axis=1)}
+
+
+def rfe_ranking(m, n_features_to_select=8, n_jobs=-1):
+    """The notebook's RFE(RandomForestClassifier(random_state=42)), with the forest fitted on all cores."""
+    rfe = RFE(RandomForestClassifier(random_state=42, n_jobs=n_jobs), n_features_to_select=n_features_to_select)
+    rfe.fit(m["codes"], m["y"])
+    return {"rfe_rank": rfe.ranking_, "rfe_selected": rfe.support_}
+
+
+def analyse(data_path=DATA_PATH, model_path=MODEL_PATH, methods=METHODS, n_jobs=-1, n_repeats=5):
+    """Relevance table (one row per input) and seconds per step."""
+    timings = {}
+    t = time.perf_counter()
+    m = prepare(data_path, model_path)
+    timings["prepare"] = time.perf_counter() - t
+
+    run = {
+        "chi2": lambda: chi2_scores(m),
+        "mi": lambda: mutual_information(m, n_jobs),
+        "permutation": lambda: permutation_importance(m, n_repeats, n_jobs),
+        "rfe": lambda: rfe_ranking(m, n_jobs=n_jobs),
+    }
+    columns = {}
+    for name in methods:
+        t = time.perf_counter()
+        columns.update(run[name]())
+        timings[name] = time.perf_counter() - t
+    table = pd.DataFrame(columns, index=pd.Index(FEATURES, name="feature"))
+    sort_by = next((c for c in ("permutation_auc_drop", "mutual_info", "chi2", "rfe_rank") if c in table), None)
+    if sort_by:
+        table = table.sort_values(sort_by, ascending=sort_by == "rfe_rank")
+    return table, {k: round(v, 3) for k, v in timings.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=METHODS)
+    parser.add_argument("--repeats", type=int, default=5, help="permutation repeats")
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--json", help="also write the table and timings here")
+    args = parser.parse_args()
+
+    table, timings = analyse(args.data, args.model, args.methods, args.jobs, args.repeats)
+    pd.set_option("display.width", 200)
+    print(table.to_string())
+    print("\nseconds:", timings)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"features": json.loads(table.to_json(orient="index")), "seconds": timings}, f, indent=2)
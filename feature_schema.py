@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Feature schema of Depression_predictor.pkl, shared by both apps, the prediction cache and the server
+(canonical columns, allowed categories and category -> index tables read from the fitted pipeline;
+rows are validated, then encoded by integer lookup straight into the model's float32 feature array)
+
+Usage:
+    python feature_schema.py                # print columns and allowed categories
+    python feature_schema.py check          # encode() vs the pipeline's preprocessor, bit for bit
+"""
+
+import argparse
+import difflib
+import math
+from collections.abc import Mapping
+
+import numpy as np
+
+from fast_scorer import COMPILED_PATH, MODEL_PATH, flatten_preprocessor, load_compiled
+
+# column order the notebook trained on
+FEATURES = [
+    "Gender", "Age", "Academic Pressure", "CGPA", "Study Satisfaction",
+    "Sleep Duration", "Dietary Habits", "Degree", "Financial Stress",
+    "Suicidal Thoughts", "Fam_hist_ml",
+]
+INT_FEATURES = {"Age", "Academic Pressure", "Study Satisfaction", "Financial Stress", "Suicidal Thoughts", "Fam_hist_ml"}
+YES_NO = {"yes": 1, "no": 0}
+
+
+class SchemaError(ValueError):
+    """A row that doesn't fit the model's inputs (lists every problem found)."""
+
+
+class FeatureSchema:
+    """Columns, categories and scaler constants of one fitted preprocessor."""
+
+    def __init__(self, arrays):
+        a = {k: np.asarray(v) for k, v in arrays.items()}
+        names = [str(c) for c in a["feature_names"]]
+        if names != FEATURES:
+            raise SchemaError(f"model was trained on {names}, expected {FEATURES}")
+        self.num_cols = [str(c) for c in a["num_cols"]]
+        self.cat_cols = [str(c) for c in a["cat_cols"]]
+        self.mean, self.scale = a["mean"].astype(np.float64), a["scale"].astype(np.float64)
+
+        # allowed values in encoder order, and value -> index within the column's one-hot block
+        self.categories, self.index, self.offset = {}, {}, {}
+        pos, col = 0, len(self.num_cols)
+        for name, size in zip(self.cat_cols, a["cat_sizes"]):
+            self.categories[name] = [str(v) for v in a["categories"][pos:pos + size]]
+            self.index[name] = {v: i for i, v in enumerate(self.categories[name])}
+            self.offset[name] = col
+            pos += size
+            col += size
+        self.n_features = col
+
+        self._num_pos = np.array([FEATURES.index(c) for c in self.num_cols])
+        self._cat_pos = [(FEATURES.index(c), self.offset[c]) for c in self.cat_cols]
+
+    @classmethod
+    def load(cls, path=COMPILED_PATH, model_path=None):
+        return cls(load_compiled(path, model_path))
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Schema of any notebook pipeline; only its fitted preprocessor is read."""
+        return cls(flatten_preprocessor(pipeline.named_steps["preprocessor"]))
+
+    # --- validation ---
+    def normalize(self, row):
+        """Hashable tuple in FEATURES order: numbers for numeric inputs, category indices for the rest.
+
+        Numbers are kept exactly as given (whole numbers as int), so the key is also the model input.
+        Raises SchemaError for unknown or missing columns, unknown categories and non-numeric values.
+        """
+        problems = []
+        for k in row:
+            if k not in self.index and k not in INT_FEATURES and k != "CGPA":
+                close = difflib.get_close_matches(str(k), FEATURES, n=1, cutoff=0.8)
+                problems.append(f"unknown column {k!r}" + (f" (did you mean {close[0]!r}?)" if close else ""))
+        key = []
+        for f in FEATURES:
+            if f not in row:
+                problems.append(f"missing column {f!r}")
+                key.append(None)
+                continue
+            v = row[f]
+            if f in self.index:
+                i = self.index[f].get(str(v).strip())
+                if i is None:
+                    problems.append(f"{f}: {v!r} is not one of {self.categories[f]}")
+                key.append(i)
+                continue
+            if isinstance(v, str):
+                v = YES_NO.get(v.strip().lower(), v)
+            try:
+                v = float(v)
+            except (TypeError, ValueError):
+                v = math.nan
+            if not math.isfinite(v):
+                problems.append(f"{f}: {row[f]!r} is not a number")
+                key.append(None)
+                continue
+            key.append(int(v) if f in INT_FEATURES and v.is_integer() else v)
+        if problems:
+            raise SchemaError("; ".join(problems))
+        return tuple(key)
+
+    def decode(self, key):
+        """Feature dict (category strings) for a normalize() tuple."""
+        row = dict(zip(FEATURES, key))
+        for f in self.cat_cols:
+            row[f] = self.categories[f][row[f]]
+        return row
+
+    # --- encoding ---
+    def encode(self, row, out=None):
+        """Scaled + one-hot float32 features, exactly as the fitted preprocessor produces them.
+
+        ``row`` is a feature dict or a normalize() tuple; ``out`` an optional preallocated
+        (n_features,) float32 row to fill in place.
+        """
+        key = self.normalize(row) if isinstance(row, Mapping) else row
+        if out is None:
+            out = np.zeros((1, self.n_features), dtype=np.float32)
+            target = out[0]
+        else:
+            out[:] = 0
+            target = out
+        nums = np.array([key[i] for i in self._num_pos], dtype=np.float64)
+        target[:len(self.num_cols)] = (nums - self.mean) / self.scale
+        for pos, offset in self._cat_pos:
+            target[offset + key[pos]] = 1.0
+        return out
+
+    def encode_many(self, rows):
+        """(n, n_features) float32 matrix for a list of feature dicts or normalize() tuples."""
+        X = np.zeros((len(rows), self.n_features), dtype=np.float32)
+        for i, row in enumerate(rows):
+            self.encode(row, out=X[i])
+        return X
+
+
+# -----------------------------
+# Check
+# -----------------------------
+def check(model_path=MODEL_PATH, n=5000, seed=0):
+    """encode_many() against pipeline.named_steps['preprocessor'] (float32, as the GBM sees it)."""
+    import joblib
+    import pandas as pd
+
+    model = joblib.load(model_path)
+    schema = FeatureSchema.from_pipeline(model)
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Age": rng.integers(15, 41, n),
+        "Academic Pressure": rng.integers(1, 6, n),
+        # the app's 0.1 steps and the survey's two-decimal grades
+        "CGPA": np.where(rng.random(n) < 0.5, np.round(rng.uniform(0, 10, n), 1), np.round(rng.uniform(0, 10, n), 2)),
+        "Study Satisfaction": rng.integers(1, 6, n),
+        "Financial Stress": rng.integers(1, 6, n),
+        "Suicidal Thoughts": rng.integers(0, 2, n),
+        "Fam_hist_ml": rng.integers(0, 2, n),
+        **{c: rng.choice(schema.categories[c], n) for c in schema.cat_cols},
+    })[FEATURES]
+    expected = np.asarray(model.named_steps["preprocessor"].transform(df), dtype=np.float32)
+    return np.array_equal(expected, schema.encode_many(df.to_dict("records")))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", choices=["show", "check"], default="show")
+    parser.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    if args.command == "check":
+        ok = check(args.model)
+        print("Bit-identical to the fitted preprocessor:", ok)
+        raise SystemExit(0 if ok else 1)
+    schema = FeatureSchema.load(COMPILED_PATH, args.model)
+    for f in FEATURES:
+        print(f"{f:<20} {schema.categories.get(f, 'numeric')}")
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in metrics for the prediction path
+(per-stage latency histograms, model-load time, error and prediction-class counters, Prometheus text format)
+
+Enable with environment variables:
+    DEPRESSION_METRICS=1                      # collect only (read with METRICS.render())
+    DEPRESSION_METRICS_PORT=9100              # also serve http://0.0.0.0:9100/metrics
+    DEPRESSION_METRICS_DUMP=metrics.prom      # also rewrite this file every DEPRESSION_METRICS_INTERVAL s (default 30)
+
+When none are set every call is a no-op.
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# seconds; prediction stages sit in the 0.1ms-100ms range
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics, self.name, self.labels = metrics, name, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key, extra=()):
+    items = list(key) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+class Metrics:
+    """Thread-safe counters and histograms; a disabled instance records nothing."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._background = []
+
+    @classmethod
+    def from_env(cls, env=os.environ):
+        port, dump = env.get("DEPRESSION_METRICS_PORT"), env.get("DEPRESSION_METRICS_DUMP")
+        metrics = cls(enabled=bool(port or dump or env.get("DEPRESSION_METRICS") not in (None, "", "0")))
+        if port:
+            metrics.serve_http(int(port))
+        if dump:
+            metrics.dump_periodically(dump, float(env.get("DEPRESSION_METRICS_INTERVAL", 30)))
+        return metrics
+
+    # --- recording ---
+    def timer(self, name, **labels):
+        return _Timer(self, name, labels) if self.enabled else nullcontext()
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(_label_key(labels))
+            if hist is None:
+                hist = series[_label_key(labels)] = Histogram()
+            hist.observe(seconds)
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + amount
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    # --- export ---
+    def render(self):
+        """Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines += [f"# HELP {name} {self._help.get(name, name)}", f"# TYPE {name} counter"]
+                lines += [f"{name}{_fmt_labels(k)} {v}" for k, v in sorted(series.items())]
+            for name, series in sorted(self._histograms.items()):
+                lines += [f"# HELP {name} {self._help.get(name, name)}", f"# TYPE {name} histogram"]
+                for key, h in sorted(series.items()):
+                    cumulative = 0
+                    for bound, c in zip(list(h.buckets) + ["+Inf"], h.counts):
+                        cumulative += c
+                        lines.append(f"{name}_bucket{_fmt_labels(key, [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_sum{_fmt_labels(key)} {h.total}")
+                    lines.append(f"{name}_count{_fmt_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def serve_http(self, port, host="0.0.0.0"):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.render().encode()
+                self.send_response(200 if self.path.startswith("/metrics") else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        self._background.append(server)
+        return server
+
+    def dump_periodically(self, path, interval=30.0):
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.dump(path)
+
+        threading.Thread(target=loop, name="metrics-dump", daemon=True).start()
+
+    def dump(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+# one registry per process (Streamlit keeps imported modules across reruns)
+METRICS = Metrics.from_env()
+METRICS.describe("prediction_stage_seconds", "Time spent per prediction stage (validate, encode, model)")
+METRICS.describe("model_load_seconds", "Time to deserialize the model file")
+METRICS.describe("predictions_total", "Predictions served, by predicted class and cache result")
+METRICS.describe("prediction_errors_total", "Failed predictions, by app and exception type")
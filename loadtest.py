@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+Headless load test for depre4.py
+(starts a real ``streamlit run`` server and drives simulated students through welcome -> details ->
+predict -> knowledge over Streamlit's websocket protocol, exactly the messages a browser sends; concurrency
+is ramped until throughput stops growing, and the server process's CPU and memory are read from /proc)
+
+Usage:
+    python loadtest.py                                    # ramp 1, 2, 4, 8, 16 concurrent sessions
+    python loadtest.py --levels 1 4 16 32 --rounds 3 --out loadtest.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+APP_PATH = "depre4.py"
+WIDGETS = ("button", "text_input", "slider", "selectbox", "number_input", "radio")
+_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+# -----------------------------
+# Server process
+# -----------------------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app_path=APP_PATH, port=None, timeout=60):
+    """``streamlit run`` in a subprocess; returns (process, port) once /_stcore/health answers."""
+    port = port or _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app_path, "--server.headless", "true",
+         "--server.port", str(port), "--server.address", "127.0.0.1", "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"streamlit exited with {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return proc, port
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise TimeoutError("streamlit server did not come up")
+
+
+def proc_cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / _TICKS  # utime + stime
+
+
+def proc_rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+# -----------------------------
+# One simulated student (a browser tab)
+# -----------------------------
+class Session:
+    """A websocket session; ``rerun`` sends widget states and waits for the script to finish."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}  # label or key -> (kind, proto) from the last run
+        self.fragments = {}  # widget id -> fragment id
+
+    @classmethod
+    async def open(cls, port):
+        ws = await websockets.connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"],
+                                      max_size=None)
+        return cls(ws)
+
+    def find(self, label):
+        for name, widget in self.widgets.items():
+            if name.startswith(label):
+                return widget
+        raise LookupError(f"no widget starting with {label!r}")
+
+    async def rerun(self, states=(), trigger=None):
+        """``states``: [(label, field, value)]; ``trigger``: label of the button clicked."""
+        msg = BackMsg()
+        client = msg.rerun_script
+        client.query_string = ""
+        client.page_script_hash = ""
+        for label, field, value in states:
+            ws = client.widget_states.widgets.add()
+            ws.id = self.find(label)[1].id
+            target = getattr(ws, field)
+            target.data.extend(value) if field.endswith("array_value") else setattr(ws, field, value)
+        if trigger:
+            button = self.find(trigger)[1]
+            ws = client.widget_states.widgets.add()
+            ws.id = button.id
+            ws.trigger_value = True
+            if button.id in self.fragments:  # a click inside a fragment reruns only the fragment
+                client.fragment_id = self.fragments[button.id]
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        await self._drain()
+        return time.perf_counter() - start
+
+    async def _drain(self):
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session" and not fwd.new_session.fragment_ids_this_run:
+                self.widgets, self.fragments = {}, {}  # full run: the page is redrawn from scratch
+            elif kind == "script_finished":
+                status = fwd.script_finished
+                if status == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue  # st.rerun(): the next run follows on the same socket
+                if status not in (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY):
+                    raise RuntimeError(f"script finished with status {status}")
+                return
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                widget_kind = element.WhichOneof("type")
+                if widget_kind in WIDGETS:
+                    proto = getattr(element, widget_kind)
+                    self.widgets[proto.label or proto.id.rsplit("-", 1)[-1]] = (widget_kind, proto)
+                    if fwd.delta.fragment_id:
+                        self.fragments[proto.id] = fwd.delta.fragment_id
+
+    async def close(self):
+        await self.ws.close()
+
+
+async def run_session(port, seed=0, keep=None):
+    """Walk the whole flow once; returns [(step, seconds)] – one entry per script rerun."""
+    rng = random.Random(seed)
+    session = await Session.open(port)
+    timings = []
+    timings.append(("open", await session.rerun()))
+    name = [("Your name", "string_value", f"Student {seed}"), ("Your city", "string_value", "Lagos")]
+    timings.append(("continue", await session.rerun(name, trigger="Continue")))
+    # buttons outside the details fragment switch page on the following rerun, as in a browser
+    timings.append(("welcome_message", await session.rerun()))
+    timings.append(("go_ahead", await session.rerun(trigger="Click here to go ahead")))
+    timings.append(("details", await session.rerun()))
+    # form widgets travel with the submit click
+    form = [(key, "double_array_value", [rng.randint(1, 5)]) for key in ("ap", "ss", "fs")]
+    form.append(("Age", "double_array_value", [rng.randint(17, 30)]))
+    form.append(("CGPA", "double_value", round(rng.uniform(5, 10), 1)))
+    timings.append(("predict", await session.rerun(form, trigger="See My Reflections")))
+    timings.append(("knowledge", await session.rerun(trigger="Learn More")))
+    session.find("⬅️ Back to Details")  # landed on the knowledge page
+    if keep is not None:
+        keep.append(session)  # hold the server-side session until memory is measured
+    else:
+        await session.close()
+    return timings
+
+
+# -----------------------------
+# Ramp
+# -----------------------------
+async def _level(port, pid, concurrency, rounds):
+    keep, peak = [], [proc_rss_mb(pid)]
+
+    async def worker(w):
+        out = []
+        for r in range(rounds):
+            out += await run_session(port, seed=w * 1000 + r, keep=keep if r == rounds - 1 else None)
+        return out
+
+    async def sample():
+        while True:
+            peak[0] = max(peak[0], proc_rss_mb(pid))
+            await asyncio.sleep(0.05)
+
+    sampler = asyncio.create_task(sample())
+    try:
+        results = await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    finally:
+        sampler.cancel()
+        peak[0] = max(peak[0], proc_rss_mb(pid))  # every last session still open
+        await asyncio.gather(*(s.close() for s in keep), return_exceptions=True)
+    return [t for ts in results for t in ts], peak[0]
+
+
+def run_level(port, pid, concurrency, rounds=2):
+    """``concurrency`` sessions at once, ``rounds`` flows each; latency plus the server's CPU and memory."""
+    rss_before = proc_rss_mb(pid)
+    cpu, wall = proc_cpu_seconds(pid), time.perf_counter()
+    results, peak = asyncio.run(_level(port, pid, concurrency, rounds))
+    wall, cpu = time.perf_counter() - wall, proc_cpu_seconds(pid) - cpu
+
+    lat = np.array([s for _, s in results]) * 1e3
+    sessions = concurrency * rounds
+    by_step = {}
+    for name, s in results:
+        by_step.setdefault(name, []).append(s * 1e3)
+    return {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "reruns": len(results),
+        "wall_seconds": wall,
+        "reruns_per_sec": len(results) / wall,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p95_ms": float(np.percentile(lat, 95)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "cpu_ms_per_session": cpu / sessions * 1e3,
+        "cpu_utilisation": cpu / wall / (os.cpu_count() or 1),
+        "peak_rss_mb": peak,
+        "rss_mb_per_session": max(peak - rss_before, 0.0) / concurrency,
+        "step_p95_ms": {k: float(np.percentile(v, 95)) for k, v in by_step.items()},
+    }
+
+
+def saturation(results, slo_ms=1000.0, min_gain=0.10):
+    """Concurrency of the last level before the first one that adds < ``min_gain`` throughput or breaks
+    the p95 SLO (the highest concurrency worth running); None if every level still scaled."""
+    for prev, r in zip(results, results[1:]):
+        if r["p95_ms"] > slo_ms or r["reruns_per_sec"] < prev["reruns_per_sec"] * (1 + min_gain):
+            return prev["concurrency"]
+    return None
+
+
+def ramp(levels=(1, 2, 4, 8, 16), rounds=2, app_path=APP_PATH, slo_ms=1000.0, min_gain=0.10, log=print):
+    """Run each level against one server; see saturation for how the result is picked."""
+    proc, port = start_server(app_path)
+    try:
+        asyncio.run(run_session(port))  # warm-up: imports, model load, st.cache_resource
+        results = []
+        for level in levels:
+            r = run_level(port, proc.pid, level, rounds)
+            results.append(r)
+            log(f"{level:>4} sessions: {r['reruns_per_sec']:7.1f} reruns/s  p50 {r['p50_ms']:7.1f} ms  "
+                f"p95 {r['p95_ms']:7.1f} ms  cpu/session {r['cpu_ms_per_session']:7.1f} ms  "
+                f"rss/session {r['rss_mb_per_session']:5.1f} MB")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return {
+        "app": app_path,
+        "cpus": os.cpu_count(),
+        "slo_p95_ms": slo_ms,
+        "saturation_concurrency": saturation(results, slo_ms, min_gain),
+        "levels": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=APP_PATH)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--rounds", type=int, default=2, help="flows per session at each level")
+    parser.add_argument("--slo-ms", type=float, default=1000.0, help="p95 rerun latency target")
+    parser.add_argument("--out", default="loadtest.json")
+    args = parser.parse_args()
+
+    report = ramp(args.levels, args.rounds, args.app, args.slo_ms)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    if report["saturation_concurrency"] is None:
+        print(f"no saturation up to {max(args.levels)} concurrent sessions -> {args.out}")
+    else:
+        print(f"saturation at {report['saturation_concurrency']} concurrent sessions -> {args.out}")
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Versioned model registry for the apps
+(each version is a directory: the pipeline dumped uncompressed for joblib's mmap_mode, the compiled arrays as
+one .npy per array – memory-mapped read-only, so every worker process shares the same page-cache copy – and
+meta.json; CURRENT names the served version and is replaced atomically, so a promotion is one rename.
+GradientBoosting versions are served from the arrays alone; for other learners they hold only the preprocessor
+and the pipeline is loaded)
+
+    models/
+        CURRENT             # "v0002"
+        v0001/  pipeline.joblib  compiled/*.npy  meta.json
+        v0002/  ...
+
+Usage:
+    python model_registry.py register Depression_predictor.pkl --promote   # train.py / update.py do this too
+    python model_registry.py list
+    python model_registry.py promote v0001          # roll back
+"""
+
+import argparse
+import datetime
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import joblib
+import numpy as np
+import sklearn
+
+from fast_scorer import MODEL_PATH, compilable, file_sha256, flatten_pipeline, flatten_preprocessor
+from feature_schema import FEATURES, FeatureSchema
+
+REGISTRY_DIR = os.environ.get("DEPRESSION_MODEL_REGISTRY", "models")
+POINTER = "CURRENT"
+REQUIREMENTS_PATH = "requirements.txt"
+_VERSION = re.compile(r"^v(\d{4,})$")
+
+
+class RegistryError(LookupError):
+    """Unknown version, empty registry, or an artifact pickled by another scikit-learn."""
+
+
+def pinned_sklearn(requirements_path=REQUIREMENTS_PATH):
+    """The scikit-learn version pinned in requirements.txt (None if unpinned)."""
+    with open(requirements_path) as f:
+        for line in f:
+            m = re.match(r"\s*scikit-learn\s*==\s*([\w.]+)", line)
+            if m:
+                return m.group(1)
+    return None
+
+
+# -----------------------------
+# Lookup
+# -----------------------------
+def versions(registry=REGISTRY_DIR):
+    if not os.path.isdir(registry):
+        return []
+    found = [d for d in os.listdir(registry) if _VERSION.match(d) and os.path.exists(os.path.join(registry, d, "meta.json"))]
+    return sorted(found, key=lambda d: int(d[1:]))
+
+
+def current(registry=REGISTRY_DIR):
+    """Version named by CURRENT, or None before the first promotion."""
+    try:
+        with open(os.path.join(registry, POINTER)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def pointer_stamp(registry=REGISTRY_DIR):
+    """Cheap change check for CURRENT (a promotion replaces the file, so the inode changes)."""
+    st = os.stat(os.path.join(registry, POINTER))
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def version_dir(version, registry=REGISTRY_DIR):
+    path = os.path.join(registry, version)
+    if not _VERSION.match(version) or not os.path.exists(os.path.join(path, "meta.json")):
+        raise RegistryError(f"no version {version!r} in {registry}")
+    return path
+
+
+def meta(version, registry=REGISTRY_DIR):
+    with open(os.path.join(version_dir(version, registry), "meta.json")) as f:
+        return json.load(f)
+
+
+def is_compiled(version, registry=REGISTRY_DIR):
+    """True if the arrays score the version on their own (FastScorer), without the pipeline."""
+    return meta(version, registry).get("compiled", True)  # versions before the flag were all GBMs
+
+
+# -----------------------------
+# Loading (memory-mapped)
+# -----------------------------
+def load_arrays(version, registry=REGISTRY_DIR):
+    """The compiled arrays of a version as read-only memmaps (FeatureSchema input; FastScorer / FastExplainer
+    input too if ``is_compiled``)."""
+    compiled = os.path.join(version_dir(version, registry), "compiled")
+    return {name[:-4]: np.load(os.path.join(compiled, name), mmap_mode="r")
+            for name in sorted(os.listdir(compiled)) if name.endswith(".npy")}
+
+
+def load_pipeline(version, registry=REGISTRY_DIR):
+    """The fitted pipeline; its NumPy arrays are memory-mapped where scikit-learn keeps them as is."""
+    info = meta(version, registry)
+    if info["sklearn"] != sklearn.__version__:
+        raise RegistryError(f"{version} was pickled with scikit-learn {info['sklearn']}, "
+                            f"this process runs {sklearn.__version__}")
+    return joblib.load(os.path.join(version_dir(version, registry), "pipeline.joblib"), mmap_mode="r")
+
+
+# -----------------------------
+# Writing
+# -----------------------------
+def register(model_path=MODEL_PATH, registry=REGISTRY_DIR, metrics=None, promote_now=False, note=None,
+             requirements_path=REQUIREMENTS_PATH):
+    """Copy a fitted pipeline into a new version directory; returns the version name.
+
+    The version is assembled in a temporary directory and renamed into place, so readers never see
+    a half-written one.
+    """
+    pinned = pinned_sklearn(requirements_path)
+    if pinned and pinned != sklearn.__version__:
+        raise RegistryError(f"requirements.txt pins scikit-learn {pinned}, this process runs {sklearn.__version__}")
+    model = joblib.load(model_path)
+    compiled = compilable(model)
+    arrays = flatten_pipeline(model) if compiled else flatten_preprocessor(model.named_steps["preprocessor"])
+    schema = FeatureSchema(arrays)  # raises SchemaError if the inputs changed
+
+    os.makedirs(registry, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=registry)
+    try:
+        joblib.dump(model, os.path.join(tmp, "pipeline.joblib"))  # uncompressed: mmap_mode needs it
+        os.mkdir(os.path.join(tmp, "compiled"))
+        for name, value in arrays.items():
+            np.save(os.path.join(tmp, "compiled", f"{name}.npy"), value)
+        info = {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "source": {"path": os.path.abspath(model_path), "sha256": file_sha256(model_path)},
+            "sklearn": sklearn.__version__,
+            "sklearn_pinned": pinned,
+            "numpy": np.__version__,
+            "features": FEATURES,
+            "categories": schema.categories,
+            "compiled": compiled,
+            "estimator": type(model.steps[-1][1]).__name__,
+            "n_trees": int(len(arrays["roots"])) if compiled else None,
+            "metrics": metrics or {},
+            "note": note,
+        }
+        while True:
+            taken = versions(registry)
+            version = f"v{int(taken[-1][1:]) + 1 if taken else 1:04d}"
+            info["version"] = version
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump(info, f, indent=2)
+            try:
+                os.rename(tmp, os.path.join(registry, version))
+                break
+            except OSError:  # another process took this number
+                if not os.path.exists(os.path.join(registry, version)):
+                    raise
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    if promote_now:
+        promote(version, registry)
+    return version
+
+
+def promote(version, registry=REGISTRY_DIR):
+    """Point CURRENT at ``version``; running PredictionCaches switch on their next request."""
+    version_dir(version, registry)
+    fd, tmp = tempfile.mkstemp(prefix=".CURRENT-", dir=registry)
+    with os.fdopen(fd, "w") as f:
+        f.write(version + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(registry, POINTER))
+    return version
+
+
+def ensure_registry(registry=REGISTRY_DIR, legacy_path=MODEL_PATH):
+    """Registry directory for the apps, seeded from the legacy .pkl on first use."""
+    if current(registry) is None:
+        existing = versions(registry)
+        if existing:
+            promote(existing[-1], registry)
+        else:
+            register(legacy_path, registry, promote_now=True, note="imported from the legacy pickle")
+    return registry
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["register", "promote", "list"])
+    parser.add_argument("target", nargs="?", help="model path (register) or version (promote)")
+    parser.add_argument("--registry", default=REGISTRY_DIR)
+    parser.add_argument("--metrics", help="JSON metrics to record, e.g. train.py's Depression_predictor.metrics.json")
+    parser.add_argument("--note")
+    parser.add_argument("--promote", action="store_true", help="serve the new version right away")
+    args = parser.parse_args()
+
+    if args.command == "register":
+        metrics = None
+        if args.metrics:
+            with open(args.metrics) as f:
+                metrics = json.load(f)
+        version = register(args.target or MODEL_PATH, args.registry, metrics, args.promote, args.note)
+        print(f"registered {version}" + (" (promoted)" if args.promote else ""))
+    elif args.command == "promote":
+        if not args.target:
+            parser.error("promote needs a version")
+        print("serving", promote(args.target, args.registry))
+    else:
+        served = current(args.registry)
+        for v in versions(args.registry):
+            info = meta(v, args.registry)
+            print(f"{'*' if v == served else ' '} {v}  {info['created']}  {info.get('estimator', '')}  "
+                  f"sklearn {info['sklearn']}  {info['source']['sha256'][:12]}  {info.get('note') or ''}")
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Bounded LRU prediction cache in front of Depression_predictor.pkl or a model registry
+(keyed on the feature schema's normalised tuple of the 11 inputs; cleared when the model file changes or
+the registry promotes another version)
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import joblib
+import pandas as pd
+
+import model_registry
+from fast_scorer import MODEL_PATH, FastScorer, compilable, flatten_pipeline
+from feature_schema import FEATURES, FeatureSchema
+from instrumentation import METRICS
+
+log = logging.getLogger(__name__)
+
+
+class PredictionCache:
+    """Thread-safe LRU of (prediction, probability) shared by every session in the process.
+
+    ``model_path`` is a pickled pipeline or a model_registry directory; with a registry the cache
+    serves whatever version CURRENT names. GradientBoosting pipelines are scored by the compiled
+    scorer (bit-identical, see fast_scorer.py); any other learner through its own pipeline.
+    ``model`` is that pipeline, or None for a compiled registry version (never unpickled).
+    """
+
+    def __init__(self, model_path=MODEL_PATH, maxsize=4096):
+        self.model_path = model_path
+        self.maxsize = maxsize
+        self.registry = os.path.isdir(model_path)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._stamp = None
+        self._loading = None  # stamp being loaded in the background
+        self._generation = 0  # bumped on every model swap
+        self.model = None
+        self.schema = None
+        self.version = None
+        self._scorer = None  # FastScorer, or None when the learner can't be compiled
+        self._explainer = None  # FastExplainer, built with the model so no request pays for it
+        self.hits = self.misses = self.evictions = self.resets = 0
+        self._load(self._source_stamp())
+
+    def _source_stamp(self):
+        if self.registry:
+            return model_registry.pointer_stamp(self.model_path)
+        st = os.stat(self.model_path)
+        return st.st_mtime_ns, st.st_size
+
+    def _check_model(self):
+        """Swap in a changed model; until it is loaded, requests keep using the current one."""
+        stamp = self._source_stamp()
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            if self._loading is not None:
+                return
+            self._loading = stamp
+        threading.Thread(target=self._reload, args=(stamp,), daemon=True).start()
+
+    def _reload(self, stamp):
+        try:
+            self._load(stamp)
+        except Exception:
+            log.exception("keeping %s: loading the new model failed", self.version or self.model_path)
+            METRICS.inc("model_reload_failures_total")
+            self._stamp = stamp  # don't retry until the source changes again
+        finally:
+            with self._lock:
+                self._loading = None
+
+    def _load(self, stamp):
+        start = time.perf_counter()
+        if self.registry:
+            # memory-mapped arrays: every worker process shares one page-cache copy of the model
+            version = model_registry.current(self.model_path)
+            arrays = model_registry.load_arrays(version, self.model_path)
+            schema = FeatureSchema(arrays)
+            if model_registry.is_compiled(version, self.model_path):
+                model = None
+            else:
+                model, arrays = model_registry.load_pipeline(version, self.model_path), None
+        else:
+            version = None
+            model = joblib.load(self.model_path)
+            arrays = flatten_pipeline(model) if compilable(model) else None
+            # the schema replaces the preprocessor; samplers such as SMOTE only act in fit
+            schema = FeatureSchema.from_pipeline(model)
+        scorer = FastScorer(arrays) if arrays is not None else None
+        explainer = None
+        if arrays is not None:
+            from explainer import FastExplainer
+            explainer = FastExplainer(arrays)  # ~0.3 s of SHAP tables: here, or on the reload thread
+        METRICS.observe("model_load_seconds", time.perf_counter() - start)
+        with self._lock:
+            if self._stamp is not None:
+                self.resets += 1
+            self.model, self.schema, self.version, self._stamp = model, schema, version, stamp
+            self._scorer, self._explainer = scorer, explainer
+            self._generation += 1
+            self._entries.clear()
+
+    def predict(self, row):
+        """Return (prediction, probability of class 1) for one feature dict.
+
+        Raises feature_schema.SchemaError if the row doesn't match the model's inputs.
+        """
+        self._check_model()
+        # one consistent model for the whole request; keys and results of an older
+        # generation never touch the cache of a newer one
+        with self._lock:
+            generation, model, schema, scorer = self._generation, self.model, self.schema, self._scorer
+        with METRICS.timer("prediction_stage_seconds", stage="validate"):
+            key = schema.normalize(row)
+        with self._lock:
+            hit = self._entries.get(key) if generation == self._generation else None
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                METRICS.inc("predictions_total", **{"class": hit[0], "cache": "hit"})
+                return hit
+            self.misses += 1
+
+        if scorer is not None:
+            # same result as model.predict_proba, without the DataFrame and string one-hot matching
+            with METRICS.timer("prediction_stage_seconds", stage="encode"):
+                X = schema.encode(key)
+            with METRICS.timer("prediction_stage_seconds", stage="model"):
+                proba = scorer.predict_proba_encoded(X)[0, 1]
+        else:
+            # other learners see exactly what their preprocessor.transform produces
+            with METRICS.timer("prediction_stage_seconds", stage="encode"):
+                X = pd.DataFrame([schema.decode(key)], columns=FEATURES)
+            with METRICS.timer("prediction_stage_seconds", stage="model"):
+                proba = model.predict_proba(X)[0, 1]
+        result = ((scorer or model).classes_[int(proba >= 0.5)], float(proba))
+        METRICS.inc("predictions_total", **{"class": result[0], "cache": "miss"})
+
+        with self._lock:
+            if generation != self._generation:  # the model was swapped while scoring
+                return result
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def predict_proba(self, rows):
+        """Class probabilities for a DataFrame of raw inputs with the current model (batch, not cached)."""
+        self._check_model()
+        with self._lock:
+            model, scorer = self.model, self._scorer
+        return (scorer or model).predict_proba(rows)
+
+    def predict_proba_encoded(self, X):
+        """Class probabilities for rows already encoded by ``schema`` (FeatureSchema.encode layout)."""
+        with self._lock:
+            model, scorer = self.model, self._scorer
+        if scorer is not None:
+            return scorer.predict_proba_encoded(X)
+        return model[1:].predict_proba(X)  # everything after the preprocessor
+
+    def explainer(self):
+        """FastExplainer for the current model, or None if the learner isn't a GradientBoosting one."""
+        self._check_model()
+        with self._lock:
+            return self._explainer
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "resets": self.resets,
+                "version": self.version,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+METRICS.describe("model_reload_failures_total", "Promoted models that failed to load (the previous one kept serving)")
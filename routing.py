@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Model routing for the prediction path: primary, A/B candidate and shadow models
+(the serving model answers synchronously; shadows score the same rows on a separate process pool
+with a bounded in-flight limit – when it is full the row is dropped, never queued behind a user)
+
+Configure the apps with environment variables:
+    DEPRESSION_SHADOW_MODELS="smote=models/smote.pkl,ada=models/ada.pkl"
+    DEPRESSION_AB_MODEL=models/candidate.pkl  DEPRESSION_AB_PERCENT=10
+    DEPRESSION_SHADOW_WORKERS=1               # shadow processes (default 1)
+
+Usage:
+    python routing.py --shadow smote=models/smote.pkl --rows 2000    # replay survey rows, print stats
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+
+import numpy as np
+
+from instrumentation import METRICS
+from prediction_cache import MODEL_PATH, PredictionCache
+
+log = logging.getLogger(__name__)
+
+# -----------------------------
+# Shadow worker side
+# -----------------------------
+_shadows = None
+
+
+def _init_shadows(paths):
+    # a shadow that fails to load reports errors per row instead of breaking the whole pool
+    global _shadows
+    _shadows = {}
+    for name, path in paths.items():
+        try:
+            _shadows[name] = PredictionCache(path, maxsize=1024)
+        except Exception as e:
+            _shadows[name] = e
+
+
+def _score_shadows(row):
+    out = {}
+    for name, model in _shadows.items():
+        if isinstance(model, Exception):
+            out[name] = (None, None, 0.0, type(model).__name__)
+            continue
+        start = time.perf_counter()
+        try:
+            prediction, proba = model.predict(row)
+            out[name] = (prediction, proba, time.perf_counter() - start, None)
+        except Exception as e:
+            out[name] = (None, None, time.perf_counter() - start, type(e).__name__)
+    return out
+
+
+# -----------------------------
+# Stats
+# -----------------------------
+class _ModelStats:
+    __slots__ = ("requests", "agreements", "abs_diff", "errors", "latencies")
+
+    def __init__(self, window=2048):
+        self.requests = self.agreements = self.errors = 0
+        self.abs_diff = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def summary(self, compared):
+        lat = np.asarray(self.latencies) * 1e3
+        out = {"requests": self.requests, "errors": self.errors,
+               "p50_ms": float(np.percentile(lat, 50)) if len(lat) else None,
+               "p99_ms": float(np.percentile(lat, 99)) if len(lat) else None}
+        if compared:
+            scored = self.requests - self.errors
+            out["agreement_rate"] = self.agreements / scored if scored else None
+            out["mean_abs_proba_diff"] = self.abs_diff / scored if scored else None
+        return out
+
+
+# -----------------------------
+# Router
+# -----------------------------
+class ModelRouter:
+    """Drop-in for PredictionCache: ``predict(row)`` -> (prediction, probability).
+
+    ``candidate`` (a predictor) serves ``ab_percent`` of routing keys; ``shadows`` maps names to
+    model paths scored in the background and compared with whatever was served.
+    """
+
+    def __init__(self, primary, candidate=None, ab_percent=0.0, shadows=None, workers=1, max_in_flight=256):
+        self.primary = primary
+        self.candidate = candidate
+        self.ab_percent = ab_percent if candidate is not None else 0.0
+        self.max_in_flight = max_in_flight
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.dropped = 0
+        self.stats = {"primary": _ModelStats()}
+        if candidate is not None:
+            self.stats["candidate"] = _ModelStats()
+        self._pool = None
+        if shadows:
+            for name in shadows:
+                self.stats[name] = _ModelStats()
+            # spawn: forking a threaded server process (Streamlit, asyncio) is unsafe
+            self._pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_init_shadows, initargs=(dict(shadows),))
+        self.shadow_names = list(shadows or ())
+
+    @classmethod
+    def from_env(cls, primary, env=os.environ):
+        shadows = dict(item.split("=", 1) for item in env.get("DEPRESSION_SHADOW_MODELS", "").split(",") if item)
+        ab_model = env.get("DEPRESSION_AB_MODEL")
+        candidate = PredictionCache(ab_model, maxsize=primary.maxsize) if ab_model else None
+        return cls(primary, candidate, float(env.get("DEPRESSION_AB_PERCENT", 0)), shadows,
+                   int(env.get("DEPRESSION_SHADOW_WORKERS", 1)))
+
+    # the primary model's schema and version, for the apps' option lists
+    @property
+    def schema(self):
+        return self.primary.schema
+
+    @property
+    def maxsize(self):
+        return self.primary.maxsize
+
+    @property
+    def version(self):
+        return self.primary.version
+
+    def arm(self, key):
+        """'candidate' for ab_percent of keys (stable per key), else 'primary'."""
+        if not self.ab_percent:
+            return "primary"
+        bucket = int.from_bytes(hashlib.blake2b(repr(key).encode(), digest_size=4).digest(), "big") % 10000
+        return "candidate" if bucket < self.ab_percent * 100 else "primary"
+
+    def route(self, row, key=None):
+        """(arm, predictor) that serves ``row``; the routing key defaults to the normalised row."""
+        arm = "primary"
+        if self.ab_percent:
+            arm = self.arm(key if key is not None else self.primary.schema.normalize(row))
+        return arm, self.candidate if arm == "candidate" else self.primary
+
+    def predict(self, row, key=None):
+        """Serve from the routed model (see route)."""
+        arm, model = self.route(row, key)
+        start = time.perf_counter()
+        result = model.predict(row)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            s = self.stats[arm]
+            s.requests += 1
+            s.latencies.append(elapsed)
+        METRICS.observe("routed_prediction_seconds", elapsed, model=arm)
+        if self._pool is not None:
+            self._submit_shadow(row, result)
+        return result
+
+    def _submit_shadow(self, row, served):
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self.dropped += 1
+                METRICS.inc("shadow_dropped_total")
+                return
+            self._in_flight += 1
+        try:
+            future = self._pool.submit(_score_shadows, dict(row))
+        except BrokenExecutor as e:  # a worker died; every shadow missed this row
+            with self._lock:
+                self._in_flight -= 1
+                for name in self.shadow_names:
+                    self.stats[name].requests += 1
+                    self.stats[name].errors += 1
+            METRICS.inc("shadow_errors_total", error=type(e).__name__)
+            log.warning("shadow pool is broken: %s", e)
+            return
+        except RuntimeError:  # pool shut down
+            with self._lock:
+                self._in_flight -= 1
+            return
+        future.add_done_callback(lambda f: self._record_shadows(f, served))
+
+    def _record_shadows(self, future, served):
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                for name in self.shadow_names:
+                    self.stats[name].requests += 1
+                    self.stats[name].errors += 1
+                error = "Cancelled" if future.cancelled() else type(future.exception()).__name__
+                METRICS.inc("shadow_errors_total", error=error)
+                return
+            for name, (prediction, proba, seconds, error) in future.result().items():
+                s = self.stats[name]
+                s.requests += 1
+                s.latencies.append(seconds)
+                if error:
+                    s.errors += 1
+                    continue
+                s.agreements += int(prediction == served[0])
+                s.abs_diff += abs(proba - served[1])
+        for name, (prediction, _, seconds, error) in future.result().items():
+            METRICS.observe("shadow_prediction_seconds", seconds, model=name)
+            if error:
+                METRICS.inc("shadow_errors_total", model=name, error=error)
+            else:
+                METRICS.inc("shadow_comparisons_total", model=name, agree=prediction == served[0])
+
+    def summary(self):
+        with self._lock:
+            return {
+                "ab_percent": self.ab_percent,
+                "in_flight": self._in_flight,
+                "dropped": self.dropped,
+                "models": {name: s.summary(compared=name in self.shadow_names) for name, s in self.stats.items()},
+            }
+
+    def close(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+METRICS.describe("routed_prediction_seconds", "Serving latency per routed arm (primary, candidate)")
+METRICS.describe("shadow_prediction_seconds", "Shadow model latency, measured in the shadow worker")
+METRICS.describe("shadow_comparisons_total", "Shadow predictions compared with the served one, by agreement")
+METRICS.describe("shadow_errors_total", "Shadow predictions that failed (model load or scoring errors, broken pool)")
+METRICS.describe("shadow_dropped_total", "Rows not sent to shadows because the in-flight limit was reached")
+
+
+if __name__ == "__main__":
+    from cleaning import load_clean
+    from feature_schema import FEATURES
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--shadow", action="append", default=[], metavar="NAME=PATH")
+    parser.add_argument("--candidate", help="model served to --ab-percent of rows")
+    parser.add_argument("--ab-percent", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    router = ModelRouter(
+        PredictionCache(args.model),
+        PredictionCache(args.candidate) if args.candidate else None, args.ab_percent,
+        dict(s.split("=", 1) for s in args.shadow), args.workers,
+    )
+    rows = load_clean()[FEATURES].head(args.rows).to_dict("records")
+    for row in rows:
+        router.predict(row)
+    router.close()
+    print(json.dumps(router.summary(), indent=2))
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Hyperparameter search for the notebook's ImbPipeline (GradientBoosting, with and without SMOTE)
+(successive halving on rows or trees – growing survivors with warm_start –, trials on a process pool, every
+trial kept in a local SQLite store)
+
+Usage:
+    python search.py                                  # halving on rows, 24 random candidates
+    python search.py --resource trees --candidates 40
+    python search.py --report                         # just summarise what is already in the store
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import sqlite3
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline as ImbPipeline
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.metrics import accuracy_score, f1_score, recall_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+
+from train import DATA_PATH, load_features, make_preprocessor
+
+STORE_PATH = "search_trials.db"
+
+SPACE = {
+    "learning_rate": [0.05, 0.1, 0.2],
+    "n_estimators": [100, 200, 400],
+    "max_depth": [2, 3, 4],
+    "subsample": [0.8, 1.0],
+    "smote": [False, True],
+}
+# what the notebook deployed (Gradmodel)
+BASELINE = {"learning_rate": 0.1, "n_estimators": 200, "max_depth": 3, "subsample": 1.0, "smote": False}
+
+
+# -----------------------------
+# Trial store
+# -----------------------------
+class TrialStore:
+    """SQLite table of finished trials, keyed on (params, resource, data) so reruns skip them."""
+
+    def __init__(self, path=STORE_PATH):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS trials ("
+            " key TEXT PRIMARY KEY, params TEXT, resource TEXT, budget INTEGER,"
+            " data TEXT, metrics TEXT, created REAL)"
+        )
+
+    @staticmethod
+    def key(params, resource, budget, data):
+        raw = json.dumps([params, resource, budget, data], sort_keys=True)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, key):
+        row = self.conn.execute("SELECT metrics FROM trials WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, params, resource, budget, data, metrics):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, json.dumps(params, sort_keys=True), resource, budget, data, json.dumps(metrics), time.time()),
+        )
+        self.conn.commit()
+
+    def frame(self):
+        rows = self.conn.execute("SELECT params, resource, budget, metrics FROM trials").fetchall()
+        records = [{**json.loads(p), "resource": r, "budget": b, **json.loads(m)} for p, r, b, m in rows]
+        return pd.DataFrame(records)
+
+
+# -----------------------------
+# Trials
+# -----------------------------
+def build_pipeline(x, params):
+    model = GradientBoostingClassifier(
+        learning_rate=params["learning_rate"], n_estimators=params["n_estimators"],
+        max_depth=params["max_depth"], subsample=params["subsample"], random_state=42,
+    )
+    steps = [("preprocessor", make_preprocessor(x))]
+    if params["smote"]:
+        steps.append(("smote", SMOTE(random_state=42)))
+    steps.append(("model", model))
+    return ImbPipeline(steps=steps)
+
+
+def run_trial(x, y, params, cv_splits=3, warm=None):
+    """Cross-validated metrics of one candidate, and its fitted fold pipelines.
+
+    ``warm`` is what an earlier call returned for the same candidate with fewer trees: its fold
+    pipelines are extended with warm_start up to ``params["n_estimators"]`` instead of refitted,
+    and fit_time stays the total for all the trees.
+    """
+    cv = StratifiedKFold(n_splits=cv_splits, shuffle=True, random_state=42)
+    scores = {"roc_auc": [], "recall": [], "f1": [], "accuracy": [], "fit_time": [], "score_time": []}
+    models = []
+    for i, (train, test) in enumerate(cv.split(x, y)):
+        if warm is not None:
+            model, fit_time = warm[0][i], warm[1][i]
+            model.named_steps["model"].set_params(warm_start=True, n_estimators=params["n_estimators"])
+        else:
+            model, fit_time = build_pipeline(x, params), 0.0
+        t = time.perf_counter()
+        model.fit(x.iloc[train], y.iloc[train])
+        scores["fit_time"].append(fit_time + time.perf_counter() - t)
+        t = time.perf_counter()
+        proba = model.predict_proba(x.iloc[test])
+        scores["score_time"].append(time.perf_counter() - t)
+        truth, pred = y.iloc[test], model.classes_[proba.argmax(axis=1)]
+        scores["roc_auc"].append(roc_auc_score(truth, proba[:, 1]))
+        scores["recall"].append(recall_score(truth, pred))
+        scores["f1"].append(f1_score(truth, pred))
+        scores["accuracy"].append(accuracy_score(truth, pred))
+        models.append(model)
+    metrics = {k: float(np.mean(v)) for k, v in scores.items()}
+    metrics["rows"] = int(len(x))
+    return metrics, (models, scores["fit_time"])
+
+
+def _keyed_trial(key, x, y, params, warm=None, keep=False):
+    metrics, fitted = run_trial(x, y, params, warm=warm)
+    return key, metrics, fitted if keep else None
+
+
+def _subsample(x, y, rows):
+    if rows >= len(x):
+        return x, y
+    x_s, _, y_s, _ = train_test_split(x, y, train_size=rows, stratify=y, random_state=42)
+    return x_s, y_s
+
+
+def _fingerprint(x, y):
+    h = pd.util.hash_pandas_object(pd.concat([x, y], axis=1), index=False).to_numpy()
+    return hashlib.sha1(h.tobytes()).hexdigest()[:16]
+
+
+def _without_trees(params):
+    return {k: v for k, v in params.items() if k != "n_estimators"}
+
+
+def sample_candidates(n, seed=42, resource="rows"):
+    """``n`` random grid points plus the deployed settings; with ``resource="trees"`` the tree count is
+    the halving budget, not a searched parameter."""
+    space = {k: v for k, v in SPACE.items() if resource != "trees" or k != "n_estimators"}
+    baseline = _without_trees(BASELINE) if resource == "trees" else BASELINE
+    grid = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    rng = np.random.default_rng(seed)
+    picked = [grid[i] for i in rng.choice(len(grid), size=min(n, len(grid)), replace=False)]
+    return [baseline] + [p for p in picked if p != baseline]
+
+
+# -----------------------------
+# Successive halving
+# -----------------------------
+def successive_halving(x, y, candidates, resource="rows", eta=3, min_rows=1000, min_trees=50,
+                       store=None, n_jobs=-1, log=print):
+    """Evaluate all candidates on a small budget, keep the best 1/eta, grow the budget, repeat.
+
+    On trees, survivors grow their fold models with warm_start instead of refitting them. The deployed
+    settings (BASELINE) are always scored as deployed – all rows, their own tree count – and flagged
+    ``baseline`` in the history.
+    """
+    store = store or TrialStore()
+    data = _fingerprint(x, y)
+    max_budget = len(x) if resource == "rows" else max(SPACE["n_estimators"])
+    min_budget = min_rows if resource == "rows" else min_trees
+    rungs = max(1, int(math.floor(math.log(max_budget / min_budget, eta))) + 1)
+    budgets = [int(min(max_budget, min_budget * eta ** i)) for i in range(rungs)]
+    budgets[-1] = max_budget
+
+    if resource == "trees":
+        candidates = [_without_trees(c) for c in candidates]
+    alive = []
+    for c in candidates:  # the same settings twice would take two surviving slots
+        if c not in alive:
+            alive.append(c)
+    fitted = {}  # trees: json(params) -> fold pipelines and fit times of the last rung
+    history = []
+    for rung, budget in enumerate(budgets):
+        x_b, y_b = _subsample(x, y, budget) if resource == "rows" else (x, y)
+        trials = []
+        for params in alive:
+            p = dict(params, n_estimators=budget) if resource == "trees" else dict(params)
+            trials.append((params, p, store.key(p, resource, budget, data)))
+
+        todo = {k: (params, p) for params, p, k in trials if store.get(k) is None}
+        log(f"rung {rung}: budget={budget} {resource}, {len(trials)} candidates, {len(todo)} to run")
+        keep_models = resource == "trees" and rung < len(budgets) - 1
+        # store each trial as it finishes, so an interrupted rung keeps what it completed
+        results = joblib.Parallel(n_jobs=n_jobs, return_as="generator_unordered")(
+            joblib.delayed(_keyed_trial)(k, x_b, y_b, p, fitted.get(json.dumps(params, sort_keys=True)), keep_models)
+            for k, (params, p) in todo.items()
+        )
+        grown = {}
+        for k, metrics, models in results:
+            store.put(k, todo[k][1], resource, budget, data, metrics)
+            if models is not None:
+                grown[json.dumps(todo[k][0], sort_keys=True)] = models
+        fitted = grown  # trials read from the store start from scratch next rung
+
+        scored = [(params, p, k, store.get(k)) for params, p, k in trials]
+        history.extend({**p, "budget": budget, "key": k, **m} for _, p, k, m in scored)
+        scored.sort(key=lambda t: t[3]["roc_auc"], reverse=True)
+        keep = max(1, len(scored) // eta) if rung < len(budgets) - 1 else len(scored)
+        alive = [params for params, _, _, _ in scored[:keep]]
+
+    # the deployed settings at their deployed size; a row-halving search already ran this trial
+    base_key = store.key(BASELINE, "rows", len(x), data)
+    if store.get(base_key) is None:
+        log("baseline: deployed settings on all rows")
+        store.put(base_key, BASELINE, "rows", len(x), data, run_trial(x, y, BASELINE)[0])
+    history = pd.DataFrame(history)
+    history["baseline"] = history["key"] == base_key
+    if not history["baseline"].any():
+        base = {**BASELINE, "budget": BASELINE["n_estimators"] if resource == "trees" else len(x),
+                "key": base_key, **store.get(base_key), "baseline": True}
+        history = pd.concat([history, pd.DataFrame([base])], ignore_index=True)
+    return history.drop(columns="key"), budgets[-1]
+
+
+def report(history, budget):
+    """Final-rung trials with their ROC AUC/recall gain over the deployed settings and relative cost."""
+    final = history[(history["budget"] == budget) | history["baseline"]].copy()
+    final["cost"] = final["fit_time"] + final["score_time"]
+    base = final[final["baseline"]]
+    if len(base):
+        b = base.iloc[0]
+        final["d_roc_auc"] = final["roc_auc"] - b["roc_auc"]
+        final["d_recall"] = final["recall"] - b["recall"]
+        final["cost_ratio"] = final["cost"] / b["cost"]
+
+    # Pareto front: no other trial has higher AUC at lower cost
+    final = final.sort_values("cost")
+    final["pareto"] = final["roc_auc"] > final["roc_auc"].cummax().shift(fill_value=-np.inf)
+    return final.sort_values("roc_auc", ascending=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--store", default=STORE_PATH)
+    parser.add_argument("--resource", choices=["rows", "trees"], default="rows")
+    parser.add_argument("--candidates", type=int, default=24)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--report", action="store_true", help="print the stored trials and exit")
+    args = parser.parse_args()
+
+    pd.set_option("display.width", 200)
+    store = TrialStore(args.store)
+    if args.report:
+        print(store.frame().sort_values("roc_auc", ascending=False).to_string(index=False))
+        raise SystemExit(0)
+
+    x, y = load_features(args.data)
+    start = time.perf_counter()
+    history, budget = successive_halving(x, y, sample_candidates(args.candidates, resource=args.resource),
+                                         args.resource, args.eta, store=store, n_jobs=args.jobs)
+    print(f"\nSearch finished in {time.perf_counter() - start:.1f}s\n")
+    print(report(history, budget).to_string(index=False))
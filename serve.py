@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP inference service for Depression_predictor.pkl
+(asyncio, stdlib only – rows are checked against feature_schema, concurrent requests are micro-batched
+into one predict_proba call)
+
+Usage:
+    python serve.py --port 8080 --max-batch 64 --max-wait-ms 5
+
+    POST /predict   {"Gender": "Male", "Age": 20, ..., "Fam_hist_ml": 0}   (or a list of such objects)
+    GET  /stats     queue depth and batch-size stats
+    GET  /health
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+import joblib
+
+from fast_scorer import MODEL_PATH
+from feature_schema import FeatureSchema
+
+
+# -----------------------------
+# Micro-batcher
+# -----------------------------
+class MicroBatcher:
+    """Collects rows from concurrent requests and scores them together."""
+
+    def __init__(self, model, max_batch=64, max_wait_ms=5.0):
+        self.model = model
+        self.schema = FeatureSchema.from_pipeline(model)
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = asyncio.Queue()
+        self.batch_sizes = Counter()
+        self.rows_scored = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+
+    async def predict(self, rows):
+        """Queue ``rows`` (list of FeatureSchema.normalize tuples) and wait for their probabilities."""
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in rows]
+        for row, fut in zip(rows, futures):
+            self.queue.put_nowait((row, fut))
+        return await asyncio.gather(*futures)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._score(loop, batch)
+
+    async def _score(self, loop, batch):
+        rows = [row for row, _ in batch]
+        start = time.perf_counter()
+        try:
+            proba = await loop.run_in_executor(None, self._predict_proba, rows)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        finally:
+            self.busy_seconds += time.perf_counter() - start
+        for (_, fut), p in zip(batch, proba):
+            if not fut.done():
+                fut.set_result(float(p))
+        self.batches += 1
+        self.rows_scored += len(batch)
+        self.batch_sizes[len(batch)] += 1
+
+    def _predict_proba(self, rows):
+        return self.model.steps[-1][1].predict_proba(self.schema.encode_many(rows))[:, 1]
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue.qsize(),
+            "batches": self.batches,
+            "rows_scored": self.rows_scored,
+            "mean_batch_size": self.rows_scored / self.batches if self.batches else 0.0,
+            "max_batch_size": max(self.batch_sizes, default=0),
+            "batch_size_counts": {str(k): v for k, v in sorted(self.batch_sizes.items())},
+            "busy_seconds": round(self.busy_seconds, 4),
+        }
+
+
+# -----------------------------
+# HTTP handling
+# -----------------------------
+STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+def parse_rows(body, schema):
+    payload = json.loads(body or b"null")
+    rows = payload if isinstance(payload, list) else [payload]
+    keys = []
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise ValueError("expected a JSON object or a list of objects")
+        try:
+            keys.append(schema.normalize(row))
+        except ValueError as e:
+            raise ValueError(f"row {i}: {e}" if len(rows) > 1 else str(e)) from None
+    return keys
+
+
+async def handle(batcher, method, path, body):
+    if path == "/health":
+        return 200, {"status": "ok"}
+    if path == "/stats":
+        return 200, batcher.stats()
+    if path != "/predict":
+        return 404, {"error": "not found"}
+    if method != "POST":
+        return 405, {"error": "use POST"}
+    try:
+        rows = parse_rows(body, batcher.schema)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    proba = await batcher.predict(rows)
+    result = [{"probability": p, "prediction": int(p >= 0.5)} for p in proba]
+    return 200, result if body.lstrip().startswith(b"[") else result[0]
+
+
+async def serve_connection(batcher, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+            try:
+                status, payload = await handle(batcher, method, path.split("?", 1)[0], body)
+            except Exception as e:
+                status, payload = 500, {"error": str(e)}
+            data = json.dumps(payload).encode()
+            keep_alive = headers.get("connection", "").lower() != "close"
+            writer.write(
+                f"HTTP/1.1 {status} {STATUS[status]}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def main(host, port, model_path, max_batch, max_wait_ms):
+    batcher = MicroBatcher(joblib.load(model_path), max_batch, max_wait_ms)
+    worker = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(lambda r, w: serve_connection(batcher, r, w), host, port)
+    print(f"Serving {model_path} on http://{host}:{port} (max batch {max_batch}, max wait {max_wait_ms} ms)")
+    async with server:
+        try:
+            await server.serve_forever()
+        finally:
+            worker.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.model, args.max_batch, args.max_wait_ms))
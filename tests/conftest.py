@@ -0,0 +1,35 @@
+import os
+import sys
+
+# the modules live at the repository root and use paths relative to it
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+
+import joblib  # noqa: E402
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def labelled_survey():
+    from feature_schema import FEATURES
+    from train import load_features
+
+    x, y = load_features()
+    return x[FEATURES].iloc[:3000], y.iloc[:3000]
+
+
+@pytest.fixture(scope="session")
+def logistic_path(labelled_survey, tmp_path_factory):
+    # a learner the compiled scorer can't handle: served through its own pipeline
+    from imblearn.pipeline import Pipeline as ImbPipeline
+    from sklearn.linear_model import LogisticRegression
+
+    from train import make_preprocessor
+
+    x, y = labelled_survey
+    model = ImbPipeline([("preprocessor", make_preprocessor(x)), ("model", LogisticRegression(max_iter=1000))])
+    path = tmp_path_factory.mktemp("models") / "logistic.pkl"
+    joblib.dump(model.fit(x, y), path)
+    return str(path)
@@ -0,0 +1,28 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_score
+from cleaning import clean
+from fast_scorer import COMPILED_PATH, MODEL_PATH
+from feature_schema import FEATURES
+from train import DATA_PATH
+
+
+@pytest.mark.parametrize("suffix, compiled", [(".csv", False), (".parquet", False), (".csv", True)])
+def test_chunked_scores_match_predict_proba(tmp_path, suffix, compiled):
+    raw = pd.read_csv(DATA_PATH, nrows=250)
+    src, dst = tmp_path / "survey.csv", str(tmp_path / f"scores{suffix}")
+    raw.to_csv(src, index=False)
+
+    rows, _ = batch_score.run(str(src), dst, COMPILED_PATH if compiled else MODEL_PATH, chunksize=60,
+                              workers=2, compiled=compiled)
+    out = pd.read_parquet(dst) if suffix == ".parquet" else pd.read_csv(dst)
+
+    expected = clean(raw, filters=False)
+    proba = joblib.load(MODEL_PATH).predict_proba(expected[FEATURES])[:, 1]
+    assert rows == len(out) == len(expected)
+    assert out["id"].tolist() == expected["id"].tolist()  # chunks come back in input order
+    np.testing.assert_allclose(out["probability"], proba, rtol=0, atol=1e-15)
+    assert np.array_equal(out["prediction"], (proba >= 0.5).astype(int))
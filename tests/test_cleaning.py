@@ -0,0 +1,63 @@
+import os
+
+import pandas as pd
+import pytest
+
+import cleaning
+from cleaning import DATA_PATH, clean, load_clean, read_raw
+
+
+def notebook_clean(raw):
+    """The cleaning cells of Health.ipynb, step by step."""
+    data = raw.copy()
+    cols_to_convert = [c for c in data.select_dtypes(include="float64").columns if c != "CGPA"]
+    data[cols_to_convert] = data[cols_to_convert].astype(int)
+    data = data[data["Financial Stress"] != "?"]
+    data["Financial Stress"] = data["Financial Stress"].astype(float).astype(int)
+    data = data[data["CGPA"] != 0]
+    for c in ("Profession", "Sleep Duration", "City"):
+        data[c] = data[c].str.replace(r"[\"']", "", regex=True)
+    data = data[~data["City"].isin(["3.0", "ME", "M.Com", "M.Tech", "City"])]
+    data["City"] = data["City"].replace({"Less Delhi": "Delhi", "Less than 5 Kalyan": "Kalyan"})
+    data["Degree"] = data["Degree"].str.replace(r"[\"']", "", regex=True)
+    data = data[(data["Study Satisfaction"] != 0) & (data["Academic Pressure"] != 0)]
+    data = data.drop(columns=["Job Satisfaction", "Work Pressure", "Work/Study Hours"])
+    data = data[data["Profession"] == "Student"]
+    data["Suicidal Thoughts"] = data["Have you ever had suicidal thoughts ?"].map({"Yes": 1, "No": 0})
+    data["Fam_hist_ml"] = data["Family History of Mental Illness"].map({"Yes": 1, "No": 0})
+    return data.reset_index(drop=True)
+
+
+@pytest.fixture(scope="module")
+def raw_sample():
+    raw = pd.read_csv(DATA_PATH)
+    edge = ((raw["Financial Stress"] == "?") | (raw["CGPA"] == 0) | (raw["Profession"] != "Student")
+            | raw["City"].isin(["3.0", "ME", "M.Com", "M.Tech", "City", "Less Delhi", "Less than 5 Kalyan"])
+            | (raw["Study Satisfaction"] == 0) | (raw["Academic Pressure"] == 0))
+    return pd.concat([raw.head(800), raw[edge]]).drop_duplicates("id").reset_index(drop=True)
+
+
+def test_clean_matches_the_notebook(raw_sample, tmp_path):
+    path = tmp_path / "sample.csv"
+    raw_sample.to_csv(path, index=False)
+    ours = clean(read_raw(path))
+    expected = notebook_clean(pd.read_csv(path))
+
+    assert len(expected) < len(raw_sample)  # the sample exercises the filters
+    assert list(ours.columns) == list(expected.columns)
+    for c in ours.columns:
+        assert ours[c].astype(str).tolist() == expected[c].astype(str).tolist(), c
+
+
+def test_cache_is_invalidated_by_a_new_cleaning_version(raw_sample, tmp_path, monkeypatch):
+    path, cache = str(tmp_path / "sample.csv"), str(tmp_path / "cache")
+    raw_sample.to_csv(path, index=False)
+    fresh = load_clean(path, cache_dir=cache)
+    stale = cleaning._cache_path(path, cache)
+    assert os.path.exists(stale)
+    fresh.head(3).to_parquet(stale, index=False)  # what an older rule set would have cached
+    assert len(load_clean(path, cache_dir=cache)) == 3  # same version: served from the cache
+
+    monkeypatch.setattr(cleaning, "CLEANING_VERSION", cleaning.CLEANING_VERSION + 1)
+    pd.testing.assert_frame_equal(load_clean(path, cache_dir=cache), fresh)
+    assert cleaning._cache_path(path, cache) != stale and os.path.exists(cleaning._cache_path(path, cache))
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cohort_cube import DIMENSIONS, MIN_COHORT, OTHER, CohortCube, aggregate
+
+
+@pytest.fixture(scope="module")
+def cube():
+    # a few large cohorts and a long tail of tiny ones, as in the real survey
+    rng = np.random.default_rng(0)
+    n = 400
+    city = np.where(np.arange(n) < 360, rng.choice(["Pune", "Surat", "Agra"], n), [f"Town{i}" for i in range(n)])
+    data = pd.DataFrame({
+        "City": city,
+        "Degree": rng.choice(["BSc", "MSc", "PhD"], n, p=[0.6, 0.35, 0.05]),
+        "Gender": rng.choice(["Male", "Female"], n),
+        "Sleep Duration": rng.choice(["5-6 hours", "7-8 hours"], n),
+        "Dietary Habits": rng.choice(["Healthy", "Unhealthy"], n),
+        "Depression": rng.integers(0, 2, n),
+        "Suicidal Thoughts": rng.integers(0, 2, n),
+    })
+    # one city with a Depression x Suicidal Thoughts leaf under the limit: 10 (yes, yes), 8 (yes, no), 2 (no, no)
+    kota = pd.DataFrame({"City": "Kota", "Degree": "BSc", "Gender": "Male", "Sleep Duration": "7-8 hours",
+                         "Dietary Habits": "Healthy", "Depression": [1] * 18 + [0] * 2,
+                         "Suicidal Thoughts": [1] * 10 + [0] * 10})
+    data = pd.concat([data, kota], ignore_index=True)
+    return CohortCube(aggregate(data, rng.random(len(data))), np.arange(len(data)), {})
+
+
+@pytest.mark.parametrize("by", [["City"], ["City", "Degree"], DIMENSIONS])
+def test_query_never_shows_small_cohorts(cube, by):
+    table = cube.query(by)
+    assert (table["students"] >= MIN_COHORT).all()
+    assert table["students"].sum() == cube.cells["students"].sum()  # merged, not dropped
+    assert (cube.query(by, min_students=1)["students"] < MIN_COHORT).any()
+
+
+def test_query_suppresses_small_filtered_totals(cube):
+    assert cube.query(City="Town380").empty
+    assert cube.query(["Degree"], City=["Town380", "Town381"]).empty
+    assert cube.query(City="Pune")["students"].iloc[0] >= MIN_COHORT
+
+
+def test_sunburst_never_shows_small_leaves(cube):
+    parts = cube.sunburst("City")
+    assert (parts["students"] >= MIN_COHORT).all()
+    assert parts["students"].sum() == cube.cells["students"].sum()
+    assert OTHER in set(parts["City"])
+    kota = parts[parts["City"] == "Kota"].set_index(["Depression", "Suicidal Thoughts"])["students"].to_dict()
+    assert kota == {(1, 1): 10, (OTHER, OTHER): 10}
@@ -0,0 +1,39 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+import feature_analysis
+from feature_schema import FEATURES
+from train import DATA_PATH, MODEL_PATH, load_features
+
+
+@pytest.fixture(scope="module")
+def sample(tmp_path_factory):
+    path = tmp_path_factory.mktemp("survey") / "sample.csv"
+    pd.read_csv(DATA_PATH, nrows=2000).to_csv(path, index=False)
+    return str(path)
+
+
+def test_prepare_shapes(sample):
+    m = feature_analysis.prepare(sample, MODEL_PATH)
+    x, y = load_features(sample)
+    n, pre = len(x), joblib.load(MODEL_PATH).named_steps["preprocessor"]
+
+    assert m["codes"].shape == (n, len(FEATURES)) and m["codes"].dtype.kind == "i"
+    assert m["discrete"].shape == (len(FEATURES),) and m["discrete"].dtype == bool
+    assert m["X"].shape == (n, len(pre.get_feature_names_out())) and m["X"].dtype == np.float32
+    assert m["y"].shape == (n,) and np.array_equal(m["y"], y.to_numpy())
+    assert len(m["groups"]) == len(FEATURES) and all(m["groups"])
+    assert sorted(j for cols in m["groups"] for j in cols) == list(range(m["X"].shape[1]))  # a partition
+
+    for i, c in enumerate(FEATURES):  # the notebook's LabelEncoder loop
+        assert np.array_equal(m["codes"][:, i], LabelEncoder().fit_transform(x[c])), c
+
+
+def test_analyse_has_one_row_per_input(sample):
+    table, seconds = feature_analysis.analyse(sample, MODEL_PATH, methods=["chi2", "mi"], n_jobs=1)
+    assert sorted(table.index) == sorted(FEATURES)
+    assert list(table.columns) == ["chi2", "chi2_p", "mutual_info"]
+    assert set(seconds) == {"prepare", "chi2", "mi"}
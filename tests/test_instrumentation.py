@@ -0,0 +1,55 @@
+import re
+
+from instrumentation import DEFAULT_BUCKETS, Metrics
+
+
+def test_render_is_prometheus_text():
+    metrics = Metrics(enabled=True)
+    metrics.describe("predictions_total", "Predictions served")
+    metrics.inc("predictions_total", label=1, cache="miss")
+    metrics.inc("predictions_total", 2, label=1, cache="miss")
+    metrics.inc("errors_total")
+    metrics.observe("stage_seconds", 0.0003, stage="model")
+    metrics.observe("stage_seconds", 10.0, stage="model")
+    with metrics.timer("stage_seconds", stage="encode"):
+        pass
+
+    text = metrics.render()
+    assert text.endswith("\n")
+    sample = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_]\w*="[^"]*",?)*\})? \S+$')
+    for line in text.splitlines():
+        assert line.startswith(("# HELP ", "# TYPE ")) or sample.match(line), line
+
+    lines = text.splitlines()
+    assert "# HELP predictions_total Predictions served" in lines
+    assert "# TYPE predictions_total counter" in lines
+    assert 'predictions_total{cache="miss",label="1"} 3' in lines
+    assert "# HELP errors_total errors_total" in lines and "errors_total 1" in lines
+    assert "# TYPE stage_seconds histogram" in lines
+
+    buckets = [line for line in lines if line.startswith('stage_seconds_bucket{stage="model"')]
+    assert len(buckets) == len(DEFAULT_BUCKETS) + 1
+    counts = [int(b.rsplit(" ", 1)[1]) for b in buckets]
+    assert counts == sorted(counts) and counts[0] == 0 and counts[-2] == 1  # cumulative; 10s only in +Inf
+    assert buckets[-1] == 'stage_seconds_bucket{stage="model",le="+Inf"} 2'
+    assert 'stage_seconds_count{stage="model"} 2' in lines
+    assert float(next(line for line in lines if line.startswith('stage_seconds_sum{stage="model"}')).split()[1]) == 10.0003
+    assert 'stage_seconds_count{stage="encode"} 1' in lines
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics()
+    metrics.describe("predictions_total", "Predictions served")
+    metrics.inc("predictions_total", label=1)
+    metrics.observe("stage_seconds", 0.1)
+    with metrics.timer("stage_seconds", stage="model") as timer:
+        pass
+    assert timer is None  # a nullcontext, no clock read
+    assert metrics._counters == {} and metrics._histograms == {}
+    assert metrics.render() == "\n"
+
+
+def test_from_env():
+    assert not Metrics.from_env({}).enabled
+    assert not Metrics.from_env({"DEPRESSION_METRICS": "0"}).enabled
+    assert Metrics.from_env({"DEPRESSION_METRICS": "1"}).enabled
@@ -0,0 +1,17 @@
+from loadtest import saturation
+
+
+def level(concurrency, throughput, p95_ms=100.0):
+    return {"concurrency": concurrency, "reruns_per_sec": throughput, "p95_ms": p95_ms}
+
+
+def test_saturation_is_the_last_level_that_scaled():
+    assert saturation([level(1, 10), level(2, 19), level(4, 20), level(8, 30)]) == 2  # 4 added < 10%
+    assert saturation([level(1, 10), level(2, 19), level(4, 30, p95_ms=1500)]) == 2  # 4 broke the SLO
+    assert saturation([level(1, 10), level(2, 10.5)], min_gain=0.01) is None
+
+
+def test_no_saturation():
+    assert saturation([level(1, 10), level(2, 19), level(4, 35)]) is None
+    assert saturation([level(1, 10)]) is None
+    assert saturation([]) is None
@@ -0,0 +1,124 @@
+"""Everything that scores outside sklearn must match ``model.predict_proba`` bit for bit."""
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from fast_scorer import MODEL_PATH, FastScorer, StaleExportError, export, flatten_pipeline, random_inputs
+
+
+@pytest.fixture(scope="module")
+def model():
+    return joblib.load(MODEL_PATH)
+
+
+@pytest.fixture(scope="module")
+def scorer(model):
+    return FastScorer(flatten_pipeline(model))
+
+
+@pytest.fixture(scope="module")
+def inputs(scorer):
+    """Random app-shaped rows (unseen categories, one- and two-decimal CGPAs) in the model's column order."""
+    return pd.DataFrame(random_inputs(scorer, 5000))[scorer.feature_names]
+
+
+def test_fast_scorer_batch(model, scorer, inputs):
+    assert np.array_equal(scorer.predict_proba(inputs), model.predict_proba(inputs))
+
+
+def test_fast_scorer_single_rows(model, scorer, inputs):
+    head = inputs.head(300)
+    single = np.vstack([scorer.predict_proba(row) for row in head.to_dict("records")])
+    assert np.array_equal(single, model.predict_proba(head))
+
+
+def test_fast_scorer_predict(model, scorer, inputs):
+    assert np.array_equal(scorer.predict(inputs), model.predict(inputs))
+
+
+def test_stale_export_is_refused(model, tmp_path):
+    pkl, npz = str(tmp_path / "m.pkl"), str(tmp_path / "m.npz")
+    joblib.dump(model, pkl)
+    export(pkl, npz)
+    FastScorer.load(npz)  # next to the pickle it came from
+    joblib.dump(model, pkl, compress=3)  # same model, different bytes: a retrain looks the same
+    with pytest.raises(StaleExportError):
+        FastScorer.load(npz)
+    np.savez(npz, **flatten_pipeline(model))  # no recorded hash
+    with pytest.raises(StaleExportError):
+        FastScorer.load(npz)
+
+
+# -----------------------------
+# Explanations (explainer.py)
+# -----------------------------
+@pytest.fixture(scope="module")
+def explainer(model):
+    from explainer import FastExplainer
+
+    return FastExplainer(flatten_pipeline(model))
+
+
+def test_explainer_matches_shap(model, explainer, scorer, inputs):
+    shap = pytest.importorskip("shap")
+    X = scorer.transform(inputs.head(500))
+    expected = shap.TreeExplainer(model.named_steps["model"]).shap_values(X.astype(np.float64))
+    np.testing.assert_allclose(explainer.column_values(X), expected, rtol=0, atol=1e-9)
+
+
+def test_explainer_matches_reference_tree_shap(explainer, scorer, inputs):
+    from explainer import _reference_tree_shap
+
+    X = scorer.transform(inputs.head(50))
+    expected = np.zeros((len(X), scorer.n_features))
+    for i in range(len(X)):
+        for tree in explainer._trees:
+            phi = np.zeros(scorer.n_features)
+            _reference_tree_shap(tree, scorer.threshold, X[i], phi)
+            expected[i] += scorer.learning_rate * phi
+    np.testing.assert_allclose(explainer.column_values(X), expected, rtol=0, atol=1e-9)
+
+
+def test_explainer_additivity(explainer, scorer, inputs):
+    total = explainer.shap_values(inputs).sum(axis=1) + explainer.expected_value
+    np.testing.assert_allclose(total, scorer.decision_function(inputs), rtol=0, atol=1e-9)
+
+
+def test_explainer_tables_hold_only_split_columns(explainer, scorer):
+    n_trees = len(scorer.roots)
+    assert explainer._tables.size <= n_trees * 8 * 256  # at most 8 split columns per tree, not n_features
+    assert explainer._tables.size < n_trees * 256 * scorer.n_features / 5
+
+
+# -----------------------------
+# Feature schema and prediction cache (feature_schema.py, prediction_cache.py)
+# -----------------------------
+@pytest.fixture(scope="module")
+def survey():
+    from feature_schema import FEATURES
+    from train import load_features
+
+    return load_features()[0][FEATURES]
+
+
+def test_schema_encode_matches_preprocessor(model, inputs):
+    from feature_schema import FeatureSchema
+
+    schema = FeatureSchema.from_pipeline(model)
+    known = inputs[np.logical_and.reduce([inputs[c].isin(schema.categories[c]) for c in schema.cat_cols])]
+    expected = np.asarray(model.named_steps["preprocessor"].transform(known), dtype=np.float32)
+    assert np.array_equal(schema.encode_many(known.to_dict("records")), expected)
+
+
+def test_prediction_cache_matches_pipeline_on_survey(model, survey):
+    from prediction_cache import PredictionCache
+
+    cache = PredictionCache(MODEL_PATH, maxsize=len(survey))
+    rows = survey.to_dict("records")
+    got = np.array([cache.predict(row) for row in rows], dtype=object)
+    assert np.array_equal(got[:, 1].astype(np.float64), model.predict_proba(survey)[:, 1])
+    assert np.array_equal(got[:, 0].astype(np.int64), model.predict(survey))
+    # second pass is served from the cache, same answers
+    assert [cache.predict(row) for row in rows[:500]] == [tuple(r) for r in got[:500]]
@@ -0,0 +1,45 @@
+import joblib
+import numpy as np
+
+import model_registry
+from fast_scorer import MODEL_PATH
+from prediction_cache import PredictionCache
+
+
+def test_compiled_version_is_served_without_the_pipeline(tmp_path, labelled_survey):
+    registry = str(tmp_path / "models")
+    version = model_registry.register(MODEL_PATH, registry, promote_now=True)
+    assert model_registry.is_compiled(version, registry)
+
+    cache = PredictionCache(registry)
+    assert cache.model is None and cache.version == version
+    assert cache._explainer is not None  # built with the model, not by the first request
+    x = labelled_survey[0].iloc[:500]
+    expected = joblib.load(MODEL_PATH).predict_proba(x)
+    assert np.array_equal(cache.predict_proba(x), expected)
+    assert [cache.predict(row)[1] for row in x.to_dict("records")] == list(expected[:, 1])
+
+
+def test_non_tree_version_keeps_its_pipeline(tmp_path, logistic_path, labelled_survey):
+    registry = str(tmp_path / "models")
+    model_registry.register(MODEL_PATH, registry, promote_now=True)
+    version = model_registry.register(logistic_path, registry)
+    assert not model_registry.is_compiled(version, registry)
+
+    cache = PredictionCache(registry)
+    assert cache.version != version  # registered, not promoted
+    model_registry.promote(version, registry)
+    cache._load(cache._source_stamp())
+    x = labelled_survey[0].iloc[:500]
+    assert cache.version == version and cache.model is not None and cache.explainer() is None
+    assert np.array_equal(cache.predict_proba(x), joblib.load(logistic_path).predict_proba(x))
+
+
+def test_reload_rebuilds_the_explainer_off_the_request_path(tmp_path):
+    registry = str(tmp_path / "models")
+    model_registry.register(MODEL_PATH, registry, promote_now=True)
+    cache = PredictionCache(registry)
+    before = cache._explainer
+    model_registry.promote(model_registry.register(MODEL_PATH, registry), registry)
+    cache._reload(cache._source_stamp())  # what the background thread runs
+    assert cache._explainer is not None and cache._explainer is not before
@@ -0,0 +1,68 @@
+import time
+
+import joblib
+import numpy as np
+import pytest
+
+from fast_scorer import MODEL_PATH
+from prediction_cache import PredictionCache
+from routing import ModelRouter
+from what_if import explore
+
+
+def wait_for(router, name, requests, timeout=60):
+    deadline = time.monotonic() + timeout
+    while router.summary()["models"][name]["requests"] < requests and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return router.summary()["models"][name]
+
+
+def test_prediction_cache_serves_non_tree_learner(logistic_path, labelled_survey):
+    x = labelled_survey[0].iloc[:200]
+    model, cache = joblib.load(logistic_path), PredictionCache(logistic_path)
+    expected = model.predict_proba(x)[:, 1]
+    got = [cache.predict(row)[1] for row in x.to_dict("records")]
+    np.testing.assert_allclose(got, expected, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(cache.predict_proba(x), model.predict_proba(x))
+    assert cache.explainer() is None
+
+
+def test_router_explains_with_the_arm_that_served(logistic_path, labelled_survey):
+    row = labelled_survey[0].iloc[0].to_dict()
+    router = ModelRouter(PredictionCache(MODEL_PATH), PredictionCache(logistic_path), ab_percent=100)
+    arm, served = router.route(row)
+    assert (arm, served) == ("candidate", router.candidate)
+    assert router.predict(row) == served.predict(row)
+    scenarios = explore(served.schema, served, row)
+    now = scenarios.loc[scenarios["changes"] == 0, "probability"].iloc[0]
+    assert now == pytest.approx(served.predict(row)[1], abs=1e-6)  # float32 encoding vs the pipeline
+
+
+def test_non_tree_shadow(logistic_path, labelled_survey):
+    rows = labelled_survey[0].iloc[:20].to_dict("records")
+    router = ModelRouter(PredictionCache(MODEL_PATH), shadows={"logistic": logistic_path})
+    try:
+        for row in rows:
+            router.predict(row)
+        stats = wait_for(router, "logistic", len(rows))
+    finally:
+        router.close()
+    assert stats["requests"] == len(rows) and stats["errors"] == 0
+
+
+def test_broken_shadow_pool_counts_errors(labelled_survey):
+    rows = labelled_survey[0].iloc[:5].to_dict("records")
+    router = ModelRouter(PredictionCache(MODEL_PATH), shadows={"copy": MODEL_PATH})
+    try:
+        router.predict(rows[0])
+        wait_for(router, "copy", 1)
+        for process in list(router._pool._processes.values()):
+            process.kill()
+            process.join()
+        for row in rows:
+            router.predict(row)
+        stats = wait_for(router, "copy", 1 + len(rows))
+    finally:
+        router.close(wait=False)
+    assert stats["requests"] == 1 + len(rows)
+    assert stats["errors"] == len(rows)
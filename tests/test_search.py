@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import search
+
+
+@pytest.fixture(scope="module")
+def small(labelled_survey):
+    x, y = labelled_survey
+    return x.iloc[:1500], y.iloc[:1500]
+
+
+def test_trees_search_has_no_duplicate_trials(small, tmp_path):
+    x, y = small
+    candidates = search.sample_candidates(6, resource="trees")
+    assert all("n_estimators" not in c for c in candidates)
+    # candidates differing only in n_estimators collapse to one trial
+    history, budget = search.successive_halving(
+        x, y, candidates + [dict(candidates[1], n_estimators=100)], "trees", min_trees=100,
+        store=search.TrialStore(str(tmp_path / "trials.db")), n_jobs=1, log=lambda *_: None)
+    params = [k for k in search.SPACE if k != "n_estimators"]
+    searched = history[~history["baseline"]]
+    assert not searched.duplicated(params + ["budget"]).any()
+
+    base = history[history["baseline"]]
+    assert len(base) == 1
+    assert base.iloc[0]["n_estimators"] == search.BASELINE["n_estimators"] and base.iloc[0]["rows"] == len(x)
+    table = search.report(history, budget)
+    assert table["baseline"].sum() == 1 and (table.loc[table["baseline"], "d_roc_auc"] == 0).all()
+
+
+def test_warm_start_grows_the_fold_models(small):
+    x, y = small
+    params = dict(search.BASELINE, n_estimators=30)
+    _, warm = search.run_trial(x, y, params)
+    first = [m.named_steps["model"].estimators_[:30, 0].copy() for m in warm[0]]
+    metrics, (models, fit_times) = search.run_trial(x, y, dict(params, n_estimators=60), warm=warm)
+    for model, old in zip(models, first):
+        gbm = model.named_steps["model"]
+        assert gbm.n_estimators_ == 60
+        assert all(a is b for a, b in zip(gbm.estimators_[:30, 0], old))  # extended, not refitted
+    assert metrics["fit_time"] == pytest.approx(np.mean(fit_times))
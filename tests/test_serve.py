@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+import joblib
+import pytest
+
+from fast_scorer import MODEL_PATH
+from serve import MicroBatcher, serve_connection
+
+
+async def request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    head, _, data = (await reader.read()).partition(b"\r\n\r\n")
+    writer.close()
+    return int(head.split()[1]), json.loads(data)
+
+
+async def session(model, rows, bad):
+    batcher = MicroBatcher(model, max_batch=16, max_wait_ms=20)
+    worker = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(lambda r, w: serve_connection(batcher, r, w), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        single = await asyncio.gather(*(request(port, "POST", "/predict", row) for row in rows))
+        many = await request(port, "POST", "/predict", rows)
+        errors = [await request(port, "POST", "/predict", b) for b in bad]
+        stats = await request(port, "GET", "/stats")
+    finally:
+        server.close()
+        worker.cancel()
+    return single, many, errors, stats[1]
+
+
+def test_micro_batched_requests_match_direct_scoring(labelled_survey):
+    model = joblib.load(MODEL_PATH)
+    frame = labelled_survey[0].iloc[:40]
+    rows = json.loads(frame.to_json(orient="records"))
+    bad = [dict(rows[0], Gender="Robot"), {k: v for k, v in rows[0].items() if k != "CGPA"}, [1, 2]]
+    single, many, errors, stats = asyncio.run(session(model, rows, bad))
+
+    expected = model.predict_proba(frame)[:, 1]
+    assert [status for status, _ in single] == [200] * len(rows)
+    assert [body["probability"] for _, body in single] == pytest.approx(list(expected), abs=0)
+    assert many[0] == 200 and [r["probability"] for r in many[1]] == pytest.approx(list(expected), abs=0)
+    assert [r["prediction"] for r in many[1]] == [int(p >= 0.5) for p in expected]
+    assert [status for status, _ in errors] == [400] * len(bad)
+    assert stats["rows_scored"] == 2 * len(rows) and stats["max_batch_size"] > 1  # concurrent rows were batched
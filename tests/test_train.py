@@ -0,0 +1,23 @@
+import json
+
+import joblib
+import numpy as np
+
+import train
+from fast_scorer import MODEL_PATH, FastScorer
+
+
+def test_train_reproduces_the_deployed_pipeline(tmp_path, labelled_survey):
+    out, metrics_path = str(tmp_path / "model.pkl"), str(tmp_path / "metrics.json")
+    model, metrics = train.train(out_path=out, metrics_path=metrics_path, compare=False, registry=None)
+    deployed = joblib.load(MODEL_PATH)
+
+    assert [name for name, _ in model.steps] == [name for name, _ in deployed.steps]
+    assert model.steps[-1][1].get_params() == deployed.steps[-1][1].get_params()
+    x = labelled_survey[0]
+    np.testing.assert_allclose(model.predict_proba(x), deployed.predict_proba(x), rtol=0, atol=1e-12)
+    assert np.array_equal(FastScorer.load(str(tmp_path / "model.npz")).predict_proba(x), model.predict_proba(x))
+
+    with open(metrics_path) as f:
+        assert json.load(f) == metrics
+    assert metrics["rows"] == len(train.load_features()[0]) and "registered" not in metrics
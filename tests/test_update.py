@@ -0,0 +1,61 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import update
+from fast_scorer import MODEL_PATH
+from train import DATA_PATH, load_features
+
+
+@pytest.fixture(scope="module")
+def raw():
+    return pd.read_csv(DATA_PATH)
+
+
+def write_delta(tmp_path, rows):
+    path = tmp_path / "delta.csv"
+    rows.to_csv(path, index=False)
+    return str(path)
+
+
+def run(tmp_path, delta, **kwargs):
+    return update.update(write_delta(tmp_path, delta), out_path=str(tmp_path / "updated.pkl"),
+                         report_path=None, registry=None, **kwargs)
+
+
+def test_one_class_delta_is_reported_not_fitted(tmp_path, raw):
+    delta = raw[raw["Depression"] == 1].sample(300, random_state=0)
+    for dry_run in (True, False):
+        updated, report = run(tmp_path, delta, dry_run=dry_run, force=True)
+        assert updated is None and report["written"] is None
+        assert report["refit_required"] and report["stages_added"] == 0
+        assert "delta: only one class, cannot fit the update" in report["reasons"]
+        assert report["psi"]["<label>"] > update.PSI_REFIT
+
+
+def test_label_drift_is_binned_per_class():
+    y_ref = pd.Series([0] * 70 + [1] * 30)  # median 0: quantile edges would leave one bin
+    assert update.drift(pd.DataFrame(index=y_ref.index), y_ref, pd.DataFrame(index=range(50)),
+                        pd.Series([1] * 50))["<label>"] > update.PSI_REFIT
+    assert update.drift(pd.DataFrame(index=y_ref.index), y_ref, pd.DataFrame(index=y_ref.index),
+                        y_ref)["<label>"] == pytest.approx(0.0)
+
+
+def test_drifted_delta_is_rejected(tmp_path, raw):
+    delta = raw[raw["Academic Pressure"] == 5].sample(600, random_state=0)
+    updated, report = run(tmp_path, delta)
+    assert updated is not None and report["written"] is None and report["refit_required"]
+    assert any(r.startswith("drift") and "Academic Pressure" in r for r in report["reasons"])
+    assert set(report["holdout"]) == {"new_holdout", "reference_in_sample"}
+
+
+def test_warm_start_adds_trees_and_keeps_the_old_ones(raw, tmp_path):
+    model = joblib.load(MODEL_PATH)
+    x, y = load_features(write_delta(tmp_path, raw.sample(500, random_state=1)))
+    updated = update.extend_model(model, x, y, stages=20)
+    old, new = model.steps[-1][1], updated.steps[-1][1]
+    assert new.n_estimators_ == old.n_estimators_ + 20 and old.n_estimators_ == 200  # the original is untouched
+    for a, b in zip(old.estimators_[:, 0], new.estimators_[:old.n_estimators_, 0]):
+        assert np.array_equal(a.tree_.threshold, b.tree_.threshold)
+        assert np.array_equal(a.tree_.value, b.tree_.value)
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Headless retraining of Depression_predictor.pkl
+(reproduces Health.ipynb: cleaning, the `new` feature frame, the CV model comparison and the final Gradmodel)
+
+Usage:
+    python train.py                                   # compare models, fit Gradmodel, write .pkl/.npz + metrics,
+                                                      # register a new version in models/
+    python train.py --promote                         # ... and serve it right away
+    python train.py --no-compare --out model.pkl      # final model only
+"""
+
+import argparse
+import json
+import logging
+import time
+
+import joblib
+import numpy as np
+from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline as ImbPipeline
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+import model_registry
+from cleaning import FAMILY_Q, SUICIDAL_Q, load_clean
+from fast_scorer import MODEL_PATH
+from model_registry import REGISTRY_DIR
+
+DATA_PATH = "student_depression_dataset.csv"
+METRICS_PATH = "Depression_predictor.metrics.json"
+TARGET = "Depression"
+
+log = logging.getLogger(__name__)
+
+
+# -----------------------------
+# Data
+# -----------------------------
+def load_features(path=DATA_PATH):
+    """Return (x, y) exactly as the notebook's `new` frame splits them."""
+    data = load_clean(path)
+    new = data.drop(columns=["id", "City", "Profession", SUICIDAL_Q, FAMILY_Q])
+    return new.drop(columns=[TARGET]), new[TARGET]
+
+
+def make_preprocessor(x):
+    num_cols = x.select_dtypes(include="number").columns.tolist()
+    cat_cols = x.select_dtypes(exclude="number").columns.tolist()
+    return ColumnTransformer(transformers=[
+        ("num", Pipeline(steps=[("scaler", StandardScaler())]), num_cols),
+        ("cat", Pipeline(steps=[("encoder", OneHotEncoder(sparse_output=False, handle_unknown="ignore"))]), cat_cols),
+    ])
+
+
+# -----------------------------
+# Models
+# -----------------------------
+def candidate_models():
+    """(models, skipped): the notebook's comparison set; LightGBM/CatBoost are used only if installed.
+
+    ``skipped`` maps each model left out to the reason, so a partial comparison is visible in the metrics.
+    """
+    models = {
+        "Logistic Regression": LogisticRegression(max_iter=1000, random_state=42),
+        "Gradient Boosting": GradientBoostingClassifier(random_state=42),
+        "AdaBoost": AdaBoostClassifier(random_state=42),
+    }
+    skipped = {}
+    try:
+        from lightgbm import LGBMClassifier
+        models["LightGBM"] = LGBMClassifier(random_state=42, verbose=-1)
+    except ImportError as e:
+        skipped["LightGBM"] = str(e)
+    try:
+        from catboost import CatBoostClassifier
+        models["CatBoost"] = CatBoostClassifier(verbose=0, random_state=42, thread_count=1)
+    except ImportError as e:
+        skipped["CatBoost"] = str(e)
+    for name, reason in skipped.items():
+        log.warning("model comparison without %s: %s", name, reason)
+    return models, skipped
+
+
+def gradmodel(x):
+    return ImbPipeline(steps=[
+        ("preprocessor", make_preprocessor(x)),
+        ("model", GradientBoostingClassifier(learning_rate=0.1, n_estimators=200, subsample=1.0, random_state=42)),
+    ])
+
+
+# -----------------------------
+# Cross-validated comparison
+# -----------------------------
+def _fold_matrices(x, y, train_idx, val_idx):
+    """Preprocess + SMOTE one fold once; every model reuses the result."""
+    pre = make_preprocessor(x).fit(x.iloc[train_idx])
+    X_tr = pre.transform(x.iloc[train_idx])
+    X_val = pre.transform(x.iloc[val_idx])
+    X_res, y_res = SMOTE(random_state=42).fit_resample(X_tr, y.iloc[train_idx])
+    return X_res, np.asarray(y_res), X_tr, y.iloc[train_idx].to_numpy(), X_val, y.iloc[val_idx].to_numpy()
+
+
+def _score_fold(model, fold):
+    X_res, y_res, X_tr, y_tr, X_val, y_val = fold
+    model = clone(model).fit(X_res, y_res)
+    val_pred = model.predict(X_val)
+    return {
+        "Train Accuracy": accuracy_score(y_tr, model.predict(X_tr)),
+        "Test Accuracy": accuracy_score(y_val, val_pred),
+        "Recall": recall_score(y_val, val_pred),
+        "Precision": precision_score(y_val, val_pred),
+        "F1 Score": f1_score(y_val, val_pred),
+        "ROC AUC": roc_auc_score(y_val, model.predict_proba(X_val)[:, 1]),
+    }
+
+
+def compare_models(x, y, n_splits=5, n_jobs=-1):
+    """5-model x 5-fold StratifiedKFold comparison (with SMOTE), run in parallel.
+
+    Returns (mean scores per model, models skipped because their library is missing).
+    """
+    X_train, _, y_train, _ = train_test_split(x, y, test_size=0.2, random_state=42)
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+    folds = joblib.Parallel(n_jobs=n_jobs)(
+        joblib.delayed(_fold_matrices)(X_train, y_train, tr, val) for tr, val in skf.split(X_train, y_train)
+    )
+    models, skipped = candidate_models()
+    jobs = [(name, i) for name in models for i in range(len(folds))]
+    scores = joblib.Parallel(n_jobs=n_jobs)(
+        joblib.delayed(_score_fold)(models[name], folds[i]) for name, i in jobs
+    )
+
+    results = {}
+    for (name, _), s in zip(jobs, scores):
+        results.setdefault(name, []).append(s)
+    return {name: {k: float(np.mean([s[k] for s in fs])) for k in fs[0]} for name, fs in results.items()}, skipped
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+def train(data_path=DATA_PATH, out_path=MODEL_PATH, metrics_path=METRICS_PATH, compare=True, n_jobs=-1,
+          registry=REGISTRY_DIR, promote=False):
+    """Fit and write the model; with a ``registry`` it becomes a new version there (served if ``promote``)."""
+    start = time.perf_counter()
+    x, y = load_features(data_path)
+    metrics = {"rows": int(len(x)), "features": list(x.columns), "positive_rate": float(y.mean())}
+
+    if compare:
+        t = time.perf_counter()
+        metrics["cv_comparison"], metrics["cv_skipped"] = compare_models(x, y, n_jobs=n_jobs)
+        metrics["cv_seconds"] = round(time.perf_counter() - t, 3)
+
+    t = time.perf_counter()
+    model = gradmodel(x).fit(x, y)
+    metrics["fit_seconds"] = round(time.perf_counter() - t, 3)
+    joblib.dump(model, out_path)
+
+    from fast_scorer import export
+    export(out_path, out_path.rsplit(".", 1)[0] + ".npz")
+
+    metrics["total_seconds"] = round(time.perf_counter() - start, 3)
+    if registry:
+        metrics["registered"] = model_registry.register(out_path, registry, dict(metrics), promote, note="train.py")
+        metrics["promoted"] = promote
+    with open(metrics_path, "w") as f:
+        json.dump(metrics, f, indent=2)
+    return model, metrics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--out", default=MODEL_PATH)
+    parser.add_argument("--metrics", default=METRICS_PATH)
+    parser.add_argument("--no-compare", action="store_true", help="skip the CV model comparison")
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--registry", default=REGISTRY_DIR, help="model registry to add the version to ('' to skip)")
+    parser.add_argument("--promote", action="store_true", help="serve the new version right away")
+    args = parser.parse_args()
+
+    _, metrics = train(args.data, args.out, args.metrics, not args.no_compare, args.jobs, args.registry, args.promote)
+    print(json.dumps(metrics, indent=2))
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental update of Depression_predictor.pkl from newly collected survey rows
+(keeps the fitted preprocessor, adds boosting stages fitted on the new rows only via warm_start,
+then checks unseen categories, feature drift and holdout metrics to tell when a full refit is due)
+
+Usage:
+    python update.py new_responses.csv                    # +20 stages, write .pkl/.npz and register a
+                                                          # version in models/ if the checks pass
+    python update.py new_responses.csv --promote          # ... and serve it right away
+    python update.py new_responses.csv --stages 50 --force
+    python update.py new_responses.csv --dry-run          # checks only
+"""
+
+import argparse
+import copy
+import json
+import time
+
+import joblib
+import numpy as np
+from sklearn.metrics import accuracy_score, recall_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+
+import model_registry
+from feature_schema import FeatureSchema
+from model_registry import REGISTRY_DIR
+from train import DATA_PATH, MODEL_PATH, load_features
+
+REPORT_PATH = "Depression_predictor.update.json"
+
+# a full refit is recommended past any of these
+PSI_REFIT = 0.25          # population stability index of any input vs the reference data
+UNSEEN_REFIT = 0.01       # share of new rows with a category the encoder has no column for
+AUC_DROP_REFIT = 0.01     # ROC AUC lost on either holdout after the update
+
+
+# -----------------------------
+# Checks
+# -----------------------------
+def unseen_categories(schema, x):
+    """{column: {value: rows}} for categories the fitted encoder never saw, and the share of rows affected."""
+    found, affected = {}, np.zeros(len(x), dtype=bool)
+    for c in schema.cat_cols:
+        values = x[c].astype(str).str.strip()
+        unseen = ~values.isin(list(schema.index[c]))
+        if unseen.any():
+            found[c] = {str(k): int(v) for k, v in values[unseen].value_counts().items()}
+            affected |= unseen.to_numpy()
+    return found, float(affected.mean()) if len(x) else 0.0
+
+
+def psi(reference, current, bins=10):
+    """Population stability index; numeric inputs are binned on the reference deciles."""
+    if reference.dtype.kind in "biuf":
+        edges = np.unique(np.quantile(reference, np.linspace(0, 1, bins + 1)[1:-1]))
+        ref = np.bincount(np.searchsorted(edges, reference, side="right"), minlength=len(edges) + 1)
+        cur = np.bincount(np.searchsorted(edges, current, side="right"), minlength=len(edges) + 1)
+    else:
+        reference, current = reference.astype(str), current.astype(str)
+        cats = np.union1d(reference, current)
+        ref = np.bincount(np.searchsorted(cats, reference), minlength=len(cats))
+        cur = np.bincount(np.searchsorted(cats, current), minlength=len(cats))
+    p = np.clip(ref / ref.sum(), 1e-4, None)
+    q = np.clip(cur / cur.sum(), 1e-4, None)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def drift(x_ref, y_ref, x_new, y_new):
+    out = {c: psi(x_ref[c].to_numpy(), x_new[c].to_numpy()) for c in x_ref.columns}
+    # the label is binned per class; quantile edges collapse to one bin whenever the median is 0
+    out["<label>"] = psi(y_ref.astype(str).to_numpy(), y_new.astype(str).to_numpy())
+    return out
+
+
+def evaluate(model, x, y):
+    if y.nunique() < 2:
+        return None
+    proba = model.predict_proba(x)[:, 1]
+    pred = (proba >= 0.5).astype(int)
+    return {"roc_auc": float(roc_auc_score(y, proba)), "recall": float(recall_score(y, pred)),
+            "accuracy": float(accuracy_score(y, pred)), "rows": int(len(y))}
+
+
+def _split(x, y, size, seed=42):
+    stratify = y if y.value_counts().min() >= 2 else None
+    return train_test_split(x, y, test_size=size, stratify=stratify, random_state=seed)
+
+
+# -----------------------------
+# Update
+# -----------------------------
+def extend_model(model, x, y, stages=20):
+    """Copy of ``model`` with ``stages`` more trees fitted on (x, y) only; the preprocessor is reused as is."""
+    model = copy.deepcopy(model)
+    pre, gbm = model.named_steps["preprocessor"], model.steps[-1][1]
+    gbm.set_params(warm_start=True, n_estimators=gbm.n_estimators_ + stages)
+    gbm.fit(pre.transform(x), y)
+    gbm.set_params(warm_start=False)
+    return model
+
+
+def update(delta_path, model_path=MODEL_PATH, out_path=None, reference_path=DATA_PATH, stages=20,
+           holdout=0.2, reference_rows=5000, force=False, dry_run=False, report_path=REPORT_PATH,
+           registry=REGISTRY_DIR, promote=False):
+    """Extend the model with the rows in ``delta_path`` and report whether a full refit is required.
+
+    Returns (updated model, report); the model is None when the delta can't be fitted (one class).
+    A written model also becomes a new version in ``registry`` (served right away if ``promote``).
+
+    Cost grows with the delta: the reference data is only read (Parquet cache) for the drift
+    baseline and a fixed-size sample to catch the update degrading older students. The deployed
+    model was fitted on all of the reference data, so that sample is in-sample (reported as
+    ``reference_in_sample``): it shows forgetting, not generalisation.
+    """
+    start = time.perf_counter()
+    out_path = out_path or model_path
+    model = joblib.load(model_path)
+    schema = FeatureSchema.from_pipeline(model)
+
+    x_new, y_new = load_features(delta_path)
+    x_ref, y_ref = load_features(reference_path)
+    x_fit, x_hold, y_fit, y_hold = _split(x_new, y_new, holdout)
+    if len(x_ref) > reference_rows:
+        _, x_ref_hold, _, y_ref_hold = _split(x_ref, y_ref, reference_rows)
+    else:
+        x_ref_hold, y_ref_hold = x_ref, y_ref
+
+    unseen, unseen_share = unseen_categories(schema, x_new)
+    psis = drift(x_ref, y_ref, x_new, y_new)
+
+    reasons = []
+    if unseen_share > UNSEEN_REFIT:
+        reasons.append(f"{unseen_share:.1%} of new rows have categories the encoder never saw: {unseen}")
+    drifted = {c: round(v, 3) for c, v in psis.items() if v > PSI_REFIT}
+    if drifted:
+        reasons.append(f"drift (PSI > {PSI_REFIT}): {drifted}")
+
+    updated, fit_seconds, metrics = None, 0.0, {}
+    if y_fit.nunique() < 2:
+        reasons.append("delta: only one class, cannot fit the update")
+    else:
+        t = time.perf_counter()
+        updated = extend_model(model, x_fit, y_fit, stages)
+        fit_seconds = time.perf_counter() - t
+        for name, (x_h, y_h) in {"new_holdout": (x_hold, y_hold),
+                                 "reference_in_sample": (x_ref_hold, y_ref_hold)}.items():
+            metrics[name] = {"before": evaluate(model, x_h, y_h), "after": evaluate(updated, x_h, y_h)}
+    for name, m in metrics.items():
+        if m["before"] is None:
+            reasons.append(f"{name}: only one class, cannot validate the update")
+        elif m["after"]["roc_auc"] < m["before"]["roc_auc"] - AUC_DROP_REFIT:
+            reasons.append(f"{name}: ROC AUC {m['before']['roc_auc']:.4f} -> {m['after']['roc_auc']:.4f}")
+
+    written = updated is not None and not dry_run and (force or not reasons)
+    version = None
+    if written:
+        joblib.dump(updated, out_path)
+        from fast_scorer import export
+        export(out_path, out_path.rsplit(".", 1)[0] + ".npz")
+        if registry:
+            version = model_registry.register(out_path, registry, {"holdout": metrics}, promote,
+                                              note=f"update.py +{stages} stages from {delta_path}")
+
+    report = {
+        "delta_rows": int(len(x_new)), "fit_rows": int(len(x_fit)), "stages_added": 0 if updated is None else stages,
+        "n_estimators": int((model if updated is None else updated).steps[-1][1].n_estimators_),
+        "fit_seconds": round(fit_seconds, 3), "total_seconds": round(time.perf_counter() - start, 3),
+        "unseen_categories": unseen, "unseen_share": unseen_share,
+        "psi": {c: round(v, 4) for c, v in psis.items()}, "holdout": metrics,
+        "refit_required": bool(reasons), "reasons": reasons, "written": out_path if written else None,
+        "registered": version, "promoted": bool(version and promote),
+    }
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+    return updated, report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("delta", help="CSV of new survey rows (same layout as student_depression_dataset.csv)")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--out", default=None, help="where to write the updated model (default: --model)")
+    parser.add_argument("--reference", default=DATA_PATH, help="data the current model was trained on")
+    parser.add_argument("--stages", type=int, default=20)
+    parser.add_argument("--report", default=REPORT_PATH)
+    parser.add_argument("--force", action="store_true", help="write the update even if a refit is recommended")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--registry", default=REGISTRY_DIR, help="model registry to add the version to ('' to skip)")
+    parser.add_argument("--promote", action="store_true", help="serve the new version right away")
+    args = parser.parse_args()
+
+    _, report = update(args.delta, args.model, args.out, args.reference, args.stages,
+                       force=args.force, dry_run=args.dry_run, report_path=args.report,
+                       registry=args.registry, promote=args.promote)
+    print(json.dumps(report, indent=2))
+    raise SystemExit(1 if report["refit_required"] else 0)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+What-if explorer for one student's profile
+(every combination of the modifiable inputs around the submitted answers, encoded as one matrix
+and scored with a single predict_proba_encoded call)
+
+Usage:
+    python what_if.py --row '{"Gender": "Male", "Age": 21, ...}'
+"""
+
+import argparse
+import itertools
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from feature_schema import FEATURES
+
+# inputs a student can act on; 1-5 scales for the numeric ones
+MODIFIABLE = ["Sleep Duration", "Dietary Habits", "Study Satisfaction", "Financial Stress", "Academic Pressure"]
+SCALE = range(1, 6)
+
+
+def scenario_grid(schema, key, inputs=MODIFIABLE):
+    """(grid, X): one row per combination of ``inputs`` (category indices / scale values) and its features.
+
+    ``key`` is a FeatureSchema.normalize tuple; every other input keeps its submitted value.
+    """
+    axes = [range(len(schema.categories[f])) if f in schema.index else SCALE for f in inputs]
+    grid = np.array(list(itertools.product(*axes)), dtype=np.int64)
+    X = np.repeat(schema.encode(key), len(grid), axis=0)
+    rows = np.arange(len(grid))
+    for j, f in enumerate(inputs):
+        if f in schema.index:
+            offset = schema.offset[f]
+            X[:, offset:offset + len(schema.categories[f])] = 0
+            X[rows, offset + grid[:, j]] = 1
+        else:
+            i = schema.num_cols.index(f)
+            X[:, i] = (grid[:, j].astype(np.float64) - schema.mean[i]) / schema.scale[i]
+    return grid, X
+
+
+def explore(schema, model, row, inputs=MODIFIABLE):
+    """DataFrame of every scenario: the inputs' values, probability, change vs now and inputs changed.
+
+    ``model`` scores encoded rows (a PredictionCache or FastScorer) and must be the one ``schema`` came
+    from. ``vague`` marks scenarios that move an input to "Others", which isn't advice anyone can follow.
+    """
+    key = schema.normalize(row)
+    grid, X = scenario_grid(schema, key, inputs)
+    proba = model.predict_proba_encoded(X)[:, 1]
+
+    current = np.array([key[FEATURES.index(f)] for f in inputs])
+    out = pd.DataFrame({
+        f: np.asarray(schema.categories[f], dtype=object)[grid[:, j]] if f in schema.index else grid[:, j]
+        for j, f in enumerate(inputs)
+    })
+    out["probability"] = proba
+    changed = grid != current
+    out["changes"] = changed.sum(axis=1)
+    out["vague"] = np.zeros(len(grid), dtype=bool)
+    for j, f in enumerate(inputs):
+        if "Others" in schema.index.get(f, {}):
+            out["vague"] |= changed[:, j] & (grid[:, j] == schema.index[f]["Others"])
+    now = proba[out["changes"].to_numpy() == 0]
+    out["delta"] = proba - (now[0] if len(now) else model.predict_proba_encoded(schema.encode(key))[0, 1])
+    return out.sort_values(["delta", "changes"], kind="stable").reset_index(drop=True)
+
+
+def best_changes(scenarios, max_changes=1, top=5):
+    """Scenarios with at most ``max_changes`` edits that lower the probability most."""
+    picked = scenarios[(scenarios["changes"] >= 1) & (scenarios["changes"] <= max_changes)
+                       & (scenarios["delta"] < 0) & ~scenarios["vague"]]
+    return picked.head(top)
+
+
+def describe(scenario, row, inputs=MODIFIABLE):
+    """'Sleep Duration: 5-6 hours → 7-8 hours, ...' for the inputs a scenario changes."""
+    return ", ".join(f"{f}: {row[f]} → {scenario[f]}" for f in inputs if str(scenario[f]) != str(row[f]).strip())
+
+
+if __name__ == "__main__":
+    from prediction_cache import MODEL_PATH, PredictionCache
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--row", required=True, help="JSON object with the 11 inputs")
+    parser.add_argument("--model", default=MODEL_PATH, help="pickled pipeline or model registry directory")
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    model, row = PredictionCache(args.model, maxsize=0), json.loads(args.row)
+    start = time.perf_counter()
+    scenarios = explore(model.schema, model, row)
+    grid_ms = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    model.predict_proba(pd.DataFrame([row], columns=FEATURES))
+    single_ms = (time.perf_counter() - start) * 1e3
+
+    print(f"{len(scenarios)} scenarios in {grid_ms:.1f} ms (one batch prediction: {single_ms:.1f} ms)")
+    for k in (1, 2):
+        print(f"\nBest with up to {k} change(s):")
+        for _, s in best_changes(scenarios, k, args.top).iterrows():
+            print(f"  {s['delta']:+.3f}  {describe(s, row)}")